@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.models import (Category, Comment, Genre, OutgoingEmail,
+                            Review, Title, TopTitle, User)
 
 
 @admin.register(User)
@@ -71,3 +72,27 @@ class CommentAdmin(admin.ModelAdmin):
         "pub_date",
     )
     empty_value_display = "-empty-"
+
+
+@admin.register(TopTitle)
+class TopTitleAdmin(admin.ModelAdmin):
+    list_display = (
+        "title",
+        "score",
+        "review_count",
+    )
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "recipient",
+        "subject",
+        "created",
+        "attempts",
+        "next_attempt_at",
+        "sent_at",
+    )
+    list_filter = ("sent_at",)
+    empty_value_display = "-empty-"
@@ -0,0 +1,170 @@
+import time
+from collections import OrderedDict
+from hashlib import sha256
+from threading import Lock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.models import User
+
+VERSION_CLAIM = 'ver'
+# Поля пользователя, которые кладутся в токен; их изменение отзывает
+# выданные токены (вместе с паролем и is_active)
+CLAIM_FIELDS = ('username', 'role', 'is_superuser')
+REVOKING_FIELDS = CLAIM_FIELDS + ('is_active', 'password')
+
+
+def auth_version_key(user_id):
+    return f'auth-version:{user_id}'
+
+
+def get_auth_state(user_id):
+    """Версия учётных данных и поля ``CLAIM_FIELDS`` активного
+    пользователя или None.
+
+    Значение кешируется на AUTH_VERSION_CACHE_TIMEOUT секунд. Токен
+    сверяется и с версией, и с ролью, так что смена роли, имени или
+    прав суперпользователя в обход сигналов (например, через
+    ``update()``) отзывает токены не позже этого срока. Смена пароля
+    в обход сигналов токены не отзывает: вызывающий код должен сам
+    увеличить ``auth_version``.
+    """
+    key = auth_version_key(user_id)
+    state = cache.get(key)
+    if state is None:
+        state = User.objects.filter(pk=user_id, is_active=True).values_list(
+            'auth_version', *CLAIM_FIELDS
+        ).first()
+        state = () if state is None else tuple(state)
+        cache.set(key, state, settings.AUTH_VERSION_CACHE_TIMEOUT)
+    return state or None
+
+
+def token_state(token):
+    """Те же значения, что у ``get_auth_state``, из утверждений токена."""
+    return (token[VERSION_CLAIM],) + tuple(
+        token[field] for field in CLAIM_FIELDS
+    )
+
+
+def forget_auth_version(user_id):
+    cache.delete(auth_version_key(user_id))
+
+
+def access_token_for(user):
+    """Access-токен с ролью и версией учётных данных пользователя."""
+    token = AccessToken.for_user(user)
+    for field in CLAIM_FIELDS:
+        token[field] = getattr(user, field)
+    token[VERSION_CLAIM] = user.auth_version
+    return token
+
+
+class VerifiedTokenCache:
+    """LRU проверенных токенов в памяти процесса.
+
+    Ключ — SHA-256 исходного токена, значение — проверенный токен и
+    момент истечения; повторный запрос с тем же токеном не декодирует
+    его и не проверяет подпись заново.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._tokens = OrderedDict()
+        self._lock = Lock()
+
+    @staticmethod
+    def digest(raw_token):
+        if isinstance(raw_token, str):
+            raw_token = raw_token.encode()
+        return sha256(raw_token).digest()
+
+    def get(self, raw_token):
+        key = self.digest(raw_token)
+        with self._lock:
+            entry = self._tokens.get(key)
+            if entry is not None and entry[1] <= time.time():
+                del self._tokens[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._tokens.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, raw_token, token):
+        if self.max_size <= 0:
+            return
+        key = self.digest(raw_token)
+        with self._lock:
+            self._tokens[key] = (token, token['exp'])
+            self._tokens.move_to_end(key)
+            while len(self._tokens) > self.max_size:
+                self._tokens.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._tokens.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'size': len(self._tokens),
+            'max_size': self.max_size,
+        }
+
+
+verified_tokens = VerifiedTokenCache(settings.VERIFIED_TOKEN_CACHE_SIZE)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация без загрузки пользователя на каждый запрос.
+
+    Пользователь собирается из утверждений токена: ``id``, ``username``,
+    ``role`` и ``is_superuser`` известны сразу, остальные поля отложены
+    и загружаются одним запросом при первом обращении. Версия учётных
+    данных и утверждения сверяются с кешем; токены без версии
+    проверяются по базе, как раньше. Проверенные токены запоминаются
+    в ``verified_tokens`` до истечения срока.
+    """
+
+    def get_validated_token(self, raw_token):
+        token = verified_tokens.get(raw_token)
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            verified_tokens.put(raw_token, token)
+        return token
+
+    def get_user(self, validated_token):
+        if VERSION_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+        if get_auth_state(user_id) != token_state(validated_token):
+            raise AuthenticationFailed('Токен отозван.', code='token_revoked')
+        claims = {
+            api_settings.USER_ID_FIELD: user_id,
+            'is_active': True,
+            'auth_version': validated_token[VERSION_CLAIM],
+        }
+        for field in CLAIM_FIELDS:
+            claims[field] = validated_token[field]
+        fields = [
+            field.attname for field in User._meta.concrete_fields
+            if field.attname in claims
+        ]
+        return User.from_db(
+            DEFAULT_DB_ALIAS, fields, [claims[name] for name in fields]
+        )
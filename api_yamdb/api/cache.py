@@ -0,0 +1,174 @@
+import time
+from functools import wraps
+from hashlib import md5
+from threading import Lock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+KEY_PREFIX = 'response-cache'
+STATS_KEYS = {
+    'hits': f'{KEY_PREFIX}:stats:hits',
+    'misses': f'{KEY_PREFIX}:stats:misses',
+}
+
+
+def version_key(namespace):
+    return f'{KEY_PREFIX}:version:{namespace}'
+
+
+def get_versions(namespaces):
+    """Текущие версии пространств имён одним обращением к кешу.
+
+    Отсутствующая версия заводится от текущего времени, чтобы после
+    вытеснения ключа версии старые ответы не стали снова видны.
+    """
+    keys = [version_key(namespace) for namespace in namespaces]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def invalidate(*namespaces):
+    """Делает недоступными все закешированные ответы пространств имён
+    после фиксации текущей транзакции."""
+    transaction.on_commit(lambda: bump_versions(namespaces))
+
+
+def bump_versions(namespaces):
+    for namespace in namespaces:
+        key = version_key(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+
+class ResponseCacheStats:
+    """Счётчики попаданий и промахов кеша ответов в памяти процесса.
+
+    На пути запроса в общий кеш ничего не пишется. При
+    ``RESPONSE_CACHE_SHARED_STATS`` накопленные значения сводятся
+    в общий кеш через ``incr`` раз в ``RESPONSE_CACHE_STATS_FLUSH``
+    событий; это корректно только там, где ``incr`` атомарен.
+    """
+
+    def __init__(self):
+        self.counts = dict.fromkeys(STATS_KEYS, 0)
+        self._pending = dict.fromkeys(STATS_KEYS, 0)
+        self._lock = Lock()
+
+    def count(self, stat):
+        with self._lock:
+            self.counts[stat] += 1
+            if not settings.RESPONSE_CACHE_SHARED_STATS:
+                return
+            self._pending[stat] += 1
+            if sum(self._pending.values()) < (
+                settings.RESPONSE_CACHE_STATS_FLUSH
+            ):
+                return
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending = self._pending
+            self._pending = dict.fromkeys(STATS_KEYS, 0)
+        for stat, delta in pending.items():
+            if not delta:
+                continue
+            try:
+                cache.incr(STATS_KEYS[stat], delta)
+            except ValueError:
+                if not cache.add(STATS_KEYS[stat], delta, timeout=None):
+                    cache.incr(STATS_KEYS[stat], delta)
+
+    def get(self, shared=False):
+        """Счётчики процесса или, при ``shared``, сведённые в общий кеш
+        счётчики всех процессов."""
+        if shared:
+            self.flush()
+            values = cache.get_many(STATS_KEYS.values())
+            stats = {
+                stat: values.get(key, 0) for stat, key in STATS_KEYS.items()
+            }
+        else:
+            with self._lock:
+                stats = dict(self.counts)
+        total = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / total if total else 0.0
+        return stats
+
+    def reset(self):
+        with self._lock:
+            self.counts = dict.fromkeys(STATS_KEYS, 0)
+            self._pending = dict.fromkeys(STATS_KEYS, 0)
+        cache.delete_many(STATS_KEYS.values())
+
+
+response_stats = ResponseCacheStats()
+
+
+def count(stat):
+    response_stats.count(stat)
+
+
+def get_stats(shared=False):
+    return response_stats.get(shared)
+
+
+def reset_stats():
+    response_stats.reset()
+
+
+def cache_response(method):
+    """Кеширует данные успешного ответа GET-действия вьюсета.
+
+    Ключ строится из хоста, пути, отсортированной строки запроса и версий
+    пространств имён ``view.get_cache_namespaces()``; сигналы моделей
+    повышают версии и тем самым сбрасывают устаревшие ответы.
+    """
+    @wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        if request.method != 'GET':
+            return method(self, request, *args, **kwargs)
+        versions = get_versions(self.get_cache_namespaces())
+        query = sorted(request.query_params.lists())
+        raw_key = f'{request.get_host()}{request.path}?{query}{versions}'
+        key = f'{KEY_PREFIX}:{md5(raw_key.encode()).hexdigest()}'
+        data = cache.get(key)
+        if data is not None:
+            count('hits')
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+        count('misses')
+        response = method(self, request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+        return response
+    return wrapper
+
+
+class CachedResponseMixin:
+    """Кеширует ответы ``list``; остальные GET-действия вьюсет
+    оборачивает декоратором ``cache_response`` сам."""
+
+    cache_namespaces = ()
+
+    def get_cache_namespaces(self):
+        return [
+            namespace.format(**self.kwargs)
+            for namespace in self.cache_namespaces
+        ]
+
+    @cache_response
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
@@ -1,6 +1,8 @@
 import django_filters as filters
+from rest_framework.filters import BaseFilterBackend
 
 from reviews.models import Title
+from reviews.search import search_titles
 
 
 class TitlesFilter(filters.FilterSet):
@@ -11,3 +13,15 @@ class TitlesFilter(filters.FilterSet):
     class Meta:
         model = Title
         fields = ['year']
+
+
+class TitleSearchFilter(BaseFilterBackend):
+    """Полнотекстовый поиск ``?search=`` с сортировкой по релевантности."""
+
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        return search_titles(queryset, query)
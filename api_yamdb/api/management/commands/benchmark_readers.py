@@ -0,0 +1,89 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from api.readers import CommentReader, ReviewReader, TitleReader
+from api.serializers import (
+    CommentSerializer,
+    ReviewSerializer,
+    TitleGetSerializer,
+)
+from reviews.models import Comment, Review, Title
+
+BENCHMARKS = (
+    (
+        'titles',
+        Title.objects.select_related('category').prefetch_related('genre'),
+        TitleGetSerializer,
+        TitleReader,
+    ),
+    (
+        'reviews',
+        Review.objects.select_related('author', 'title'),
+        ReviewSerializer,
+        ReviewReader,
+    ),
+    (
+        'comments',
+        Comment.objects.select_related('author', 'review'),
+        CommentSerializer,
+        CommentReader,
+    ),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает стоимость одного элемента списка при сериализации '
+        'через ModelSerializer и через чтение строк values().'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=100,
+            help='Размер страницы.',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Количество повторов, берётся лучшее время.',
+        )
+
+    def handle(self, *args, **options):
+        limit = options['limit']
+        repeat = options['repeat']
+        for name, queryset, serializer_class, reader_class in BENCHMARKS:
+            queryset = queryset.order_by('pk')
+
+            def serialize():
+                return serializer_class(queryset[:limit], many=True).data
+
+            def read():
+                reader = reader_class(serializer_class())
+                return reader.read(reader.prepare(queryset)[:limit])
+
+            size = len(read())
+            if not size:
+                self.stdout.write(f'{name}: нет данных')
+                continue
+            slow = self.measure(serialize, repeat) / size
+            fast = self.measure(read, repeat) / size
+            self.stdout.write(
+                f'{name}: {size} шт., ModelSerializer {slow * 1e6:.1f} мкс, '
+                f'values() {fast * 1e6:.1f} мкс на элемент, '
+                f'быстрее в {slow / fast:.1f} раза'
+            )
+        self.stdout.write(self.style.SUCCESS('Готово'))
+
+    @staticmethod
+    def measure(function, repeat):
+        best = None
+        for _ in range(repeat):
+            started = perf_counter()
+            function()
+            elapsed = perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
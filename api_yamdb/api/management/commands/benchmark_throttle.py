@@ -0,0 +1,54 @@
+import os
+import tempfile
+from time import perf_counter, time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.throttling import ALGORITHMS, MemoryStore, SQLiteStore
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет стоимость одной проверки ограничителя частоты '
+        'для хранилищ в памяти и в SQLite.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=10000,
+            help='Количество проверок на каждое сочетание.',
+        )
+        parser.add_argument(
+            '--keys',
+            type=int,
+            default=100,
+            help='Количество разных ключей (IP-адресов).',
+        )
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        keys = [
+            f'10.0.{number // 256}.{number % 256}'
+            for number in range(options['keys'])
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            stores = (
+                ('memory', MemoryStore(settings.THROTTLE_MEMORY_MAX_KEYS)),
+                ('sqlite', SQLiteStore(os.path.join(directory, 'throttle'))),
+            )
+            for store_name, store in stores:
+                for name, algorithm_class in ALGORITHMS.items():
+                    algorithm = algorithm_class(iterations, 60)
+                    started = perf_counter()
+                    for number in range(iterations):
+                        key = f'{name}:{keys[number % len(keys)]}'
+                        store.apply(key, algorithm, time())
+                    elapsed = perf_counter() - started
+                    self.stdout.write(
+                        f'{store_name} {name}: '
+                        f'{elapsed / iterations * 1e6:.1f} мкс на проверку'
+                    )
+        self.stdout.write(self.style.SUCCESS('Готово'))
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.cache import get_stats, reset_stats
+
+
+class Command(BaseCommand):
+    help = 'Показывает статистику попаданий в кеш ответов API.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Обнулить счётчики после вывода.',
+        )
+
+    def handle(self, *args, **options):
+        if not settings.RESPONSE_CACHE_SHARED_STATS:
+            raise CommandError(
+                'Счётчики ведутся в памяти каждого процесса: команда не '
+                'видит счётчики веб-воркеров. Включите '
+                'RESPONSE_CACHE_SHARED_STATS с кешем memcached или redis.'
+            )
+        stats = get_stats(shared=True)
+        self.stdout.write(
+            f'Попаданий: {stats["hits"]}, промахов: {stats["misses"]}, '
+            f'доля попаданий: {stats["hit_rate"]:.1%}'
+        )
+        if options['reset']:
+            reset_stats()
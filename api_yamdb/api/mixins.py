@@ -1,4 +1,6 @@
-from rest_framework import mixins, viewsets
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import mixins, permissions, serializers, viewsets
 
 
 class CreateListViewSet(mixins.CreateModelMixin,
@@ -6,3 +8,124 @@ class CreateListViewSet(mixins.CreateModelMixin,
                         mixins.DestroyModelMixin,
                         viewsets.GenericViewSet):
     pass
+
+
+def parse_field_list(value):
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+
+def flatten_select_related(tree, prefix=""):
+    for name, subtree in tree.items():
+        path = prefix + name
+        if subtree:
+            yield from flatten_select_related(subtree, path + "__")
+        else:
+            yield path
+
+
+class SparseFieldsMixin:
+    """Поддержка ``?fields=`` и ``?omit=`` для сериализатора верхнего уровня.
+
+    Влияет только на представление: валидация входных данных
+    не меняется. ``sparse_sources`` сопоставляет полям-свойствам
+    столбцы модели, которые им нужны.
+    """
+
+    sparse_sources = {}
+
+    def get_sparse_selection(self):
+        if not hasattr(self, "_sparse_selection"):
+            self._sparse_selection = None
+            parent = self.parent
+            if isinstance(parent, serializers.ListSerializer):
+                parent = parent.parent
+            request = self.context.get("request")
+            if parent is None and request is not None:
+                params = request.query_params
+                only = params.get("fields")
+                omit = params.get("omit")
+                if only or omit:
+                    self._sparse_selection = (
+                        parse_field_list(only) if only else None,
+                        parse_field_list(omit or ""),
+                    )
+        return self._sparse_selection
+
+    @property
+    def _readable_fields(self):
+        selection = self.get_sparse_selection()
+        for field in super()._readable_fields:
+            if selection is not None:
+                only, omit = selection
+                if only is not None and field.field_name not in only:
+                    continue
+                if field.field_name in omit:
+                    continue
+            yield field
+
+
+class SparseQuerysetMixin:
+    """Не загружает связи и столбцы, которые сериализатор не выведет.
+
+    Для безопасных методов оставляет в queryset только те
+    ``select_related``/``prefetch_related``, что нужны выбранным полям,
+    и ограничивает столбцы через ``only()``. Столбцы
+    ``sparse_required_fields`` остаются всегда: без внешнего ключа,
+    по которому отбирает related manager, Django дозагружал бы его
+    отдельным запросом на каждый объект.
+    """
+
+    sparse_required_fields = ()
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.method not in permissions.SAFE_METHODS:
+            return queryset
+        serializer = self.get_serializer()
+        if not isinstance(serializer, SparseFieldsMixin):
+            return queryset
+        if serializer.get_sparse_selection() is None:
+            return queryset
+        attrs = set()
+        for field in serializer._readable_fields:
+            if field.source == "*":
+                return queryset
+            attrs.add(field.source_attrs[0])
+        return self.restrict_queryset(
+            queryset, attrs, serializer, self.sparse_required_fields
+        )
+
+    @staticmethod
+    def restrict_queryset(queryset, attrs, serializer, required=()):
+        model_fields = {"pk", *required}
+        deferrable = True
+        for attr in attrs:
+            if attr in serializer.sparse_sources:
+                model_fields.update(serializer.sparse_sources[attr])
+                continue
+            try:
+                field = queryset.model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                deferrable = False
+                continue
+            if field.concrete and not field.many_to_many:
+                model_fields.add(attr)
+
+        select_related = queryset.query.select_related
+        if isinstance(select_related, dict):
+            paths = [
+                path for path in flatten_select_related(select_related)
+                if path.split("__")[0] in attrs
+            ]
+            queryset = queryset.select_related(None)
+            if paths:
+                queryset = queryset.select_related(*paths)
+        lookups = [
+            lookup for lookup in queryset._prefetch_related_lookups
+            if (lookup.prefetch_through if isinstance(lookup, Prefetch)
+                else lookup).split("__")[0] in attrs
+        ]
+        queryset = queryset.prefetch_related(None).prefetch_related(*lookups)
+        if deferrable:
+            queryset = queryset.only(*model_fields)
+        return queryset
@@ -0,0 +1,203 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import connections
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class CursorOrLimitOffsetPagination(LimitOffsetPagination):
+    """Limit/offset по умолчанию, keyset-пагинация по запросу.
+
+    Режим курсора включается параметром ``?pagination=cursor`` или
+    наличием ``?cursor=``. Страница выбирается условием по ключу
+    сортировки ``view.cursor_ordering`` (последнее поле должно быть
+    уникальным), без ``COUNT(*)`` и ``OFFSET``. NULL считается
+    наименьшим значением. Страница может состоять как из объектов,
+    так и из строк ``values()``.
+    """
+
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+    invalid_cursor_message = 'Некорректный курсор.'
+
+    def cursor_requested(self, request):
+        return (
+            self.cursor_query_param in request.query_params
+            or request.query_params.get(self.mode_query_param)
+            == self.cursor_mode
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.use_cursor = self.cursor_requested(request)
+        if not self.use_cursor:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.ordering = self.get_ordering(queryset, view)
+        position, reverse = self.decode_cursor(request, queryset.model)
+
+        queryset = queryset.order_by(*self.get_order_by(queryset, reverse))
+        if position is not None:
+            queryset = queryset.filter(
+                self.get_seek_filter(queryset, position, reverse)
+            )
+        page = list(queryset[:self.limit + 1])
+        has_more = len(page) > self.limit
+        page = page[:self.limit]
+        if reverse:
+            page.reverse()
+
+        self.has_next = has_more if not reverse else position is not None
+        self.has_previous = has_more if reverse else position is not None
+        self.page = page
+        return page
+
+    def get_paginated_response(self, data):
+        if not self.use_cursor:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_next_link(self):
+        if not self.use_cursor:
+            return super().get_next_link()
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.use_cursor:
+            return super().get_previous_link()
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_ordering(self, queryset, view):
+        ordering = getattr(view, 'cursor_ordering', None)
+        if not ordering:
+            ordering = list(queryset.model._meta.ordering) + ['pk']
+        return [
+            (name.lstrip('-'), name.startswith('-')) for name in ordering
+        ]
+
+    def get_order_by(self, queryset, reverse):
+        # Там, где NULL и так наименьшее значение (SQLite, MySQL), явный
+        # NULLS FIRST/LAST не нужен и мешал бы сортировке по индексу.
+        explicit_nulls = connections[queryset.db].features.nulls_order_largest
+        order_by = []
+        for name, descending in self.ordering:
+            expression = F(name)
+            nulls = (
+                explicit_nulls and self.is_nullable(queryset, name)
+            ) or None
+            if descending != reverse:
+                order_by.append(expression.desc(nulls_last=nulls))
+            else:
+                order_by.append(expression.asc(nulls_first=nulls))
+        return order_by
+
+    def get_seek_filter(self, queryset, position, reverse):
+        seek = Q(pk__in=[])
+        equal = Q()
+        for (name, descending), value in zip(self.ordering, position):
+            nullable = self.is_nullable(queryset, name)
+            if descending != reverse:
+                if value is None:
+                    after = None
+                else:
+                    after = Q(**{f'{name}__lt': value})
+                    if nullable:
+                        after |= Q(**{f'{name}__isnull': True})
+            elif value is None:
+                after = Q(**{f'{name}__isnull': False})
+            else:
+                after = Q(**{f'{name}__gt': value})
+            if after is not None:
+                seek |= equal & after
+            if value is None:
+                equal &= Q(**{f'{name}__isnull': True})
+            else:
+                equal &= Q(**{name: value})
+        return seek
+
+    def is_nullable(self, queryset, name):
+        model = queryset.model
+        nullable = False
+        for part in name.split('__'):
+            if part == 'pk':
+                return nullable
+            field = model._meta.get_field(part)
+            nullable = nullable or field.null
+            if field.is_relation:
+                model = field.related_model
+        return nullable
+
+    def get_field(self, model, name):
+        for part in name.split('__'):
+            field = model._meta.pk if part == 'pk' else (
+                model._meta.get_field(part)
+            )
+            if field.is_relation:
+                model = field.related_model
+        return field
+
+    def get_position(self, instance):
+        position = []
+        for name, _ in self.ordering:
+            if isinstance(instance, dict):
+                position.append(self.dump_value(instance[name]))
+                continue
+            value = instance
+            for part in name.split('__'):
+                if value is None:
+                    break
+                value = getattr(value, part)
+            position.append(self.dump_value(value))
+        return position
+
+    @staticmethod
+    def dump_value(value):
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        return value
+
+    def encode_cursor(self, instance, reverse):
+        payload = {'p': self.get_position(instance)}
+        if reverse:
+            payload['r'] = 1
+        cursor = urlsafe_b64encode(
+            json.dumps(payload, separators=(',', ':')).encode()
+        ).decode()
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.mode_query_param)
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request, model):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+        try:
+            payload = json.loads(urlsafe_b64decode(cursor.encode()))
+            position = payload['p']
+            if len(position) != len(self.ordering):
+                raise ValueError
+            position = [
+                None if value is None
+                else self.get_field(model, name).to_python(value)
+                for (name, _), value in zip(self.ordering, position)
+            ]
+        except (TypeError, ValueError, KeyError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, bool(payload.get('r'))
@@ -0,0 +1,128 @@
+from collections import defaultdict
+from operator import itemgetter
+
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from reviews.models import SCORES, SCORE_COUNT_FIELDS, Title
+
+_datetime_field = serializers.DateTimeField()
+
+
+def format_datetime(value):
+    """Дата в том же формате, что у ``serializers.DateTimeField``."""
+    return _datetime_field.to_representation(value)
+
+
+class ValuesReader:
+    """Строит элементы списка из строк ``values()`` без ModelSerializer.
+
+    Набор и порядок полей берутся у сериализатора вьюсета, поэтому
+    вывод совпадает с ним, включая ``?fields=`` и ``?omit=``.
+    ``columns`` задаёт столбцы ``values()`` для поля (по умолчанию —
+    одноимённый столбец), метод ``read_<поле>(row)`` — его значение.
+    """
+
+    columns = {}
+
+    def __init__(self, serializer):
+        self.field_names = [
+            field.field_name for field in serializer._readable_fields
+        ]
+
+    def prepare(self, queryset, extra=()):
+        columns = dict.fromkeys(["id"])
+        for name in self.field_names:
+            columns.update(dict.fromkeys(self.columns.get(name, (name,))))
+        columns.update(dict.fromkeys(extra))
+        return queryset.prefetch_related(None).values(*columns)
+
+    def preload(self, rows):
+        pass
+
+    def read(self, rows):
+        rows = list(rows)
+        self.preload(rows)
+        readers = [
+            (name, getattr(self, f"read_{name}", itemgetter(name)))
+            for name in self.field_names
+        ]
+        return [{name: read(row) for name, read in readers} for row in rows]
+
+
+class TitleReader(ValuesReader):
+    columns = {
+        "category": ("category", "category__name", "category__slug"),
+        "genre": (),
+        "histogram": SCORE_COUNT_FIELDS,
+    }
+
+    def preload(self, rows):
+        self.genres = defaultdict(list)
+        if "genre" not in self.field_names or not rows:
+            return
+        through = (
+            Title.genre.through.objects
+            .filter(title_id__in=[row["id"] for row in rows])
+            .order_by("genre__name")
+            .values_list("title_id", "genre__name", "genre__slug")
+        )
+        for title_id, name, slug in through:
+            self.genres[title_id].append({"name": name, "slug": slug})
+
+    def read_category(self, row):
+        if row["category"] is None:
+            return None
+        return {"name": row["category__name"], "slug": row["category__slug"]}
+
+    def read_genre(self, row):
+        return self.genres.get(row["id"], [])
+
+    def read_histogram(self, row):
+        return {
+            str(score): row[field]
+            for score, field in zip(SCORES, SCORE_COUNT_FIELDS)
+        }
+
+
+class ReviewReader(ValuesReader):
+    columns = {"author": ("author__username",)}
+
+    def read_author(self, row):
+        return row["author__username"]
+
+    def read_pub_date(self, row):
+        return format_datetime(row["pub_date"])
+
+
+class CommentReader(ValuesReader):
+    columns = {"author": ("author__username",)}
+
+    def read_author(self, row):
+        return row["author__username"]
+
+    def read_pub_date(self, row):
+        return format_datetime(row["pub_date"])
+
+
+class ValuesListMixin:
+    """Отдаёт ``list`` через ``reader_class`` вместо сериализатора."""
+
+    reader_class = None
+
+    def get_reader(self):
+        return self.reader_class(self.get_serializer())
+
+    def list(self, request, *args, **kwargs):
+        if self.reader_class is None:
+            return super().list(request, *args, **kwargs)
+        reader = self.get_reader()
+        ordering = getattr(self, "cursor_ordering", None) or ()
+        queryset = reader.prepare(
+            self.filter_queryset(self.get_queryset()),
+            extra=[name.lstrip("-") for name in ordering],
+        )
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(reader.read(queryset))
+        return self.get_paginated_response(reader.read(page))
@@ -1,83 +1,162 @@
+from django.db import IntegrityError, transaction
+from django.db.models import prefetch_related_objects
 from django.shortcuts import get_object_or_404
+from django.utils.encoding import smart_str
 from rest_framework import serializers
-from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
 
-from reviews.models import Category, Genre, Title, User, Comment, Review
+from reviews.bulk import bulk_create_with_pks
+from reviews.models import (Category, Genre, Title, User, Comment, Review,
+                            SCORE_COUNT_FIELDS)
+from reviews.search import index_titles
+from reviews.signals import titles_changed
+from .mixins import SparseFieldsMixin
 
 SIGNUP_ERROR_MESSAGE = "Ошибка, имя me зарезервировано системой."
+DUPLICATE_REVIEW_MESSAGE = "Можно оставить только один отзыв"
 USERNAME_REGEX = r"^[\w.@+-]+$"
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         exclude = ["id"]
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Genre
         exclude = ["id"]
 
 
-class TitlePostSerializer(serializers.ModelSerializer):
-    category = serializers.SlugRelatedField(
+class PreloadedSlugRelatedField(serializers.SlugRelatedField):
+    """SlugRelatedField, который сначала ищет объект в словаре
+    ``context["preloaded"][model]``, загруженном одним запросом."""
+
+    def to_internal_value(self, data):
+        model = self.get_queryset().model
+        preloaded = self.context.get("preloaded", {}).get(model)
+        if preloaded is None:
+            return super().to_internal_value(data)
+        try:
+            return preloaded[smart_str(data)]
+        except KeyError:
+            self.fail(
+                "does_not_exist",
+                slug_name=self.slug_field,
+                value=smart_str(data),
+            )
+
+
+class TitleListSerializer(serializers.ListSerializer):
+    """Массовое создание произведений: слаги загружаются одним запросом
+    на модель, произведения и связи с жанрами — через bulk_create."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            items = [item for item in data if isinstance(item, dict)]
+            genre_slugs = []
+            for item in items:
+                genre = item.get("genre", [])
+                genre_slugs.extend(
+                    genre if isinstance(genre, list) else [genre]
+                )
+            self.context["preloaded"] = {
+                Category: self.preload(
+                    Category, [item.get("category") for item in items]
+                ),
+                Genre: self.preload(Genre, genre_slugs),
+            }
+        return super().to_internal_value(data)
+
+    @staticmethod
+    def preload(model, slugs):
+        slugs = {smart_str(slug) for slug in slugs if slug is not None}
+        return {obj.slug: obj for obj in model.objects.filter(slug__in=slugs)}
+
+    def create(self, validated_data):
+        genres = [item.pop("genre", []) for item in validated_data]
+        with transaction.atomic():
+            titles = bulk_create_with_pks(
+                Title, [Title(**item) for item in validated_data]
+            )
+            Title.genre.through.objects.bulk_create([
+                Title.genre.through(title_id=title.pk, genre_id=genre_id)
+                for title, title_genres in zip(titles, genres)
+                for genre_id in {genre.pk for genre in title_genres}
+            ])
+            index_titles(
+                (title.pk, title.name, title.description) for title in titles
+            )
+        titles_changed.send(sender=Title)
+        prefetch_related_objects(titles, "genre")
+        return titles
+
+
+class TitlePostSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    category = PreloadedSlugRelatedField(
         slug_field="slug", queryset=Category.objects.all()
     )
-    genre = serializers.SlugRelatedField(
+    genre = PreloadedSlugRelatedField(
         slug_field="slug", queryset=Genre.objects.all(), many=True
     )
 
     class Meta:
-        fields = "__all__"
+        exclude = ("rating_sum", "rating_count", "rating") + SCORE_COUNT_FIELDS
         model = Title
+        list_serializer_class = TitleListSerializer
 
 
-class TitleGetSerializer(serializers.ModelSerializer):
+class TitleGetSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     category = CategorySerializer()
     genre = GenreSerializer(many=True)
     rating = serializers.IntegerField(read_only=True)
+    histogram = serializers.DictField(
+        child=serializers.IntegerField(), read_only=True
+    )
+    sparse_sources = {"histogram": SCORE_COUNT_FIELDS}
 
     class Meta:
-        fields = "__all__"
+        exclude = ("rating_sum", "rating_count") + SCORE_COUNT_FIELDS
         model = Title
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not self.context.get("with_histogram"):
+            self.fields.pop("histogram")
+
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True,
         slug_field="username",
         default=serializers.CurrentUserDefault(),
     )
-    title = serializers.SlugRelatedField(
-        slug_field="id", many=False, read_only=True
-    )
-
-    def validate(self, data):
-        request = self.context["request"]
-        title_id = self.context.get("view").kwargs.get("title_id")
-        title = get_object_or_404(Title, pk=title_id)
-        if (
-            request.method == "POST"
-            and Review.objects.filter(
-                title=title, author=request.user
-            ).exists()
-        ):
-            raise ValidationError("Можно оставить только один отзыв")
-        return data
+    title = serializers.PrimaryKeyRelatedField(read_only=True)
 
     class Meta:
         fields = "__all__"
         model = Review
 
+    def create(self, validated_data):
+        """Повторный отзыв отсекает ограничение ``uniq_author``,
+        без предварительной проверки и гонки между ней и вставкой."""
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [DUPLICATE_REVIEW_MESSAGE]}
+            )
+
     def validate_score(self, value):
         if 0 > value > 10:
             raise serializers.ValidationError("Не коректно указанный рейтинг!")
         return value
 
 
-class CommentSerializer(serializers.ModelSerializer):
-    review = serializers.SlugRelatedField(slug_field="text", read_only=True)
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    review = serializers.PrimaryKeyRelatedField(read_only=True)
     author = serializers.SlugRelatedField(
         read_only=True,
         slug_field="username",
@@ -89,7 +168,7 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = ("id", "text", "author", "pub_date", "review")
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         fields = (
             "username",
@@ -124,6 +203,7 @@ class TokenSerializer(serializers.Serializer):
             raise serializers.ValidationError(
                 "Не совпадает код подтверждения!"
             )
+        data["user"] = user
         return data
 
     class Meta:
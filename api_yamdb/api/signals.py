@@ -0,0 +1,81 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_save)
+from django.dispatch import receiver
+
+from reviews.models import Category, Genre, Review, Title, User
+from reviews.signals import data_loaded, titles_changed
+
+from .authentication import REVOKING_FIELDS, forget_auth_version
+from .cache import invalidate
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_categories(sender, **kwargs):
+    invalidate('categories', 'titles')
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def invalidate_genres(sender, **kwargs):
+    invalidate('genres', 'titles')
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+@receiver(m2m_changed, sender=Title.genre.through)
+@receiver(titles_changed, sender=Title)
+def invalidate_titles(sender, **kwargs):
+    invalidate('titles')
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_reviews(sender, instance, **kwargs):
+    invalidate('titles', f'reviews:{instance.title_id}')
+
+
+@receiver(data_loaded)
+def invalidate_loaded(sender, **kwargs):
+    invalidate('categories', 'genres', 'titles', 'reviews')
+
+
+@receiver(post_save, sender=User)
+def invalidate_authors(sender, created, **kwargs):
+    if not created:
+        invalidate('reviews')
+
+
+@receiver(pre_save, sender=User)
+def detect_credentials_change(sender, instance, raw, update_fields, **kwargs):
+    if raw or instance.pk is None:
+        return
+    fields = [
+        field for field in REVOKING_FIELDS
+        if update_fields is None or field in update_fields
+    ]
+    if not fields:
+        return
+    old = User.objects.filter(pk=instance.pk).values(*fields).first()
+    instance._credentials_changed = old is not None and any(
+        old[field] != getattr(instance, field) for field in fields
+    )
+
+
+@receiver(post_save, sender=User)
+def revoke_tokens(sender, instance, **kwargs):
+    """Смена роли, пароля или блокировка отзывает выданные токены."""
+    if getattr(instance, '_credentials_changed', False):
+        instance._credentials_changed = False
+        User.objects.filter(pk=instance.pk).update(
+            auth_version=F('auth_version') + 1
+        )
+        instance.refresh_from_db(fields=['auth_version'])
+        transaction.on_commit(lambda: forget_auth_version(instance.pk))
+
+
+@receiver(post_delete, sender=User)
+def forget_deleted_user(sender, instance, **kwargs):
+    transaction.on_commit(lambda: forget_auth_version(instance.pk))
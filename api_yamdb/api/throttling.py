@@ -0,0 +1,236 @@
+import json
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+
+class TokenBucket:
+    """Корзина на ``limit`` запросов, полностью пополняется за ``period``
+    секунд. Состояние: (токены, время последнего обновления)."""
+
+    def __init__(self, limit, period):
+        self.limit = limit
+        self.period = period
+        self.rate = limit / period
+
+    def __call__(self, state, now):
+        tokens, updated = state or (self.limit, now)
+        tokens = min(self.limit, tokens + (now - updated) * self.rate)
+        if tokens >= 1:
+            return (tokens - 1, now), 0
+        return (tokens, now), (1 - tokens) / self.rate
+
+
+class SlidingWindow:
+    """Не больше ``limit`` запросов за любые ``period`` секунд
+    (оценка по текущему и предыдущему окнам). Состояние: (начало
+    текущего окна, запросов в предыдущем, запросов в текущем)."""
+
+    def __init__(self, limit, period):
+        self.limit = limit
+        self.period = period
+
+    def __call__(self, state, now):
+        start = math.floor(now / self.period) * self.period
+        previous = current = 0
+        if state is not None:
+            old_start, old_previous, old_current = state
+            if old_start == start:
+                previous, current = old_previous, old_current
+            elif old_start == start - self.period:
+                previous = old_current
+        weight = 1 - (now - start) / self.period
+        if previous * weight + current + 1 <= self.limit:
+            return (start, previous, current + 1), 0
+        if current + 1 > self.limit:
+            # Текущее окно заполнено: ждём его конца и ухода его доли
+            wait = start + self.period - now + self.period * (
+                1 - (self.limit - 1) / current
+            )
+        else:
+            needed = (self.limit - 1 - current) / previous
+            wait = start + self.period * (1 - needed) - now
+        return (start, previous, current), max(wait, 0.001)
+
+
+ALGORITHMS = {
+    'token_bucket': TokenBucket,
+    'sliding_window': SlidingWindow,
+}
+
+
+class MemoryStore:
+    """Состояния ограничителей в памяти процесса.
+
+    Как и в SQLiteStore, состояние живёт два периода после последнего
+    обращения: к этому времени корзина заполнена, а окно пусто. Сверх
+    того хранится не больше ``max_keys`` ключей (LRU), чтобы поток
+    запросов со случайными именами не раздувал память процесса.
+    """
+
+    cleanup_every = 1000
+
+    def __init__(self, max_keys):
+        self.max_keys = max_keys
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+        self._calls = 0
+
+    def apply(self, key, algorithm, now):
+        with self._lock:
+            entry = self._states.pop(key, None)
+            old_state = entry[0] if entry and entry[1] >= now else None
+            state, wait = algorithm(old_state, now)
+            self._states[key] = (state, now + 2 * algorithm.period)
+            while len(self._states) > self.max_keys:
+                self._states.popitem(last=False)
+            self._calls += 1
+            if self._calls % self.cleanup_every == 0:
+                self.cleanup(now)
+        return wait
+
+    def cleanup(self, now):
+        expired = [
+            key for key, (_, expires) in self._states.items()
+            if expires < now
+        ]
+        for key in expired:
+            del self._states[key]
+
+    def __len__(self):
+        return len(self._states)
+
+    def clear(self):
+        with self._lock:
+            self._states.clear()
+
+
+class SQLiteStore:
+    """Состояния в отдельном файле SQLite, общем для всех воркеров
+    одной машины. Каждая проверка — короткая транзакция
+    ``BEGIN IMMEDIATE``, так что воркеры не теряют обновления друг друга.
+    """
+
+    cleanup_every = 1000
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._calls = 0
+
+    def get_connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path, timeout=5, isolation_level=None
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS throttle '
+                '(key TEXT PRIMARY KEY, state TEXT NOT NULL, '
+                'expires REAL NOT NULL)'
+            )
+            self._local.connection = connection
+        return connection
+
+    def apply(self, key, algorithm, now):
+        connection = self.get_connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute(
+                'SELECT state FROM throttle WHERE key = ?', (key,)
+            ).fetchone()
+            state, wait = algorithm(
+                json.loads(row[0]) if row else None, now
+            )
+            connection.execute(
+                'INSERT OR REPLACE INTO throttle (key, state, expires) '
+                'VALUES (?, ?, ?)',
+                (key, json.dumps(state), now + 2 * algorithm.period),
+            )
+            self._calls += 1
+            if self._calls % self.cleanup_every == 0:
+                connection.execute(
+                    'DELETE FROM throttle WHERE expires < ?', (now,)
+                )
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+        return wait
+
+    def clear(self):
+        self.get_connection().execute('DELETE FROM throttle')
+
+
+_stores = {}
+
+
+def get_store():
+    backend = settings.THROTTLE_STORE
+    path = settings.THROTTLE_SQLITE_PATH
+    key = (backend, path if backend == 'sqlite' else None)
+    if key not in _stores:
+        _stores[key] = (
+            SQLiteStore(path) if backend == 'sqlite'
+            else MemoryStore(settings.THROTTLE_MEMORY_MAX_KEYS)
+        )
+    return _stores[key]
+
+
+class BucketThrottle(BaseThrottle):
+    """Ограничение частоты по правилам ``settings.AUTH_THROTTLES[scope]``.
+
+    Правило — (ключ, алгоритм, лимит, период в секундах); ключ ``ip``
+    или ``username`` (из тела запроса). Запрос проходит, только если
+    его пропускают все правила; ``wait()`` попадает в ``Retry-After``.
+    """
+
+    scope = None
+
+    def get_key(self, kind, request):
+        if kind == 'ip':
+            return self.get_ident(request)
+        if kind == 'username':
+            if not isinstance(request.data, Mapping):
+                return None
+            username = request.data.get('username')
+            return str(username).lower() if username else None
+        raise ValueError(f'Неизвестный ключ ограничения: {kind}')
+
+    def allow_request(self, request, view):
+        store = get_store()
+        now = time.time()
+        self.wait_seconds = 0
+        for kind, name, limit, period in settings.AUTH_THROTTLES[self.scope]:
+            key = self.get_key(kind, request)
+            if key is None:
+                continue
+            algorithm = ALGORITHMS[name](limit, period)
+            wait = store.apply(
+                f'{self.scope}:{kind}:{name}:{period}:{key}', algorithm, now
+            )
+            self.wait_seconds = max(self.wait_seconds, wait)
+        return not self.wait_seconds
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class SignupThrottle(BucketThrottle):
+    scope = 'signup'
+
+
+class TokenThrottle(BucketThrottle):
+    scope = 'token'
+
+
+class AvailabilityThrottle(BucketThrottle):
+    scope = 'available'
@@ -1,4 +1,4 @@
-from django.urls import path, include
+from django.urls import path, include, re_path
 from rest_framework.routers import DefaultRouter
 
 from api.views import (
@@ -6,6 +6,8 @@ from api.views import (
     CommentViewSet,
     CategoryViewSet,
     APISignup,
+    AvailabilityView,
+    ExportView,
     UserViewSet,
     GenreViewSet,
     TitleViewSet,
@@ -50,11 +52,22 @@ auth_patterns = [
         'signup/',
         APISignup.as_view(),
         name='signup'
-    )
+    ),
+    path(
+        'available/',
+        AvailabilityView.as_view(),
+        name='available'
+    ),
 ]
 
 urlpatterns = [
     path('v1/', include(v1_router.urls)),
     path('', include(v1_router.urls)),
-    path('v1/auth/', include(auth_patterns))
+    path('v1/auth/', include(auth_patterns)),
+    re_path(
+        r'^v1/export/(?P<table>\w+)\.(?P<file_format>csv|ndjson)'
+        r'(?P<compress>\.gz)?/?$',
+        ExportView.as_view(),
+        name='export'
+    ),
 ]
@@ -1,26 +1,44 @@
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Q
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from django.contrib.auth.tokens import default_token_generator
 from rest_framework.pagination import LimitOffsetPagination
 from rest_framework import filters, viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import AccessToken
 
-from reviews.models import Category, Genre, Title, Review, User
+from reviews.models import Category, Genre, Title, Review, TopTitle, User
+from reviews.bloom import is_taken, user_filter
+from reviews.csv_data import CONTENT_TYPES, TABLES_BY_NAME, export_stream
+from reviews.outbox import enqueue_email
 from api_yamdb.settings import DEFAULT_FROM_EMAIL
-from .mixins import CreateListViewSet
+from .authentication import access_token_for
+from .cache import CachedResponseMixin, cache_response
+from .mixins import (
+    CreateListViewSet,
+    SparseQuerysetMixin,
+    parse_field_list,
+)
 from .permissions import (
     IsAdminOrReadOnly,
     AuthorOrAdminOrModeratorReadOnly,
     IsAdmin,
 )
-from .filters import TitlesFilter
+from .filters import TitleSearchFilter, TitlesFilter
+from .pagination import CursorOrLimitOffsetPagination
+from .readers import (
+    CommentReader,
+    ReviewReader,
+    TitleReader,
+    ValuesListMixin,
+)
+from .throttling import AvailabilityThrottle, SignupThrottle, TokenThrottle
 from .serializers import (
     CategorySerializer,
     GenreSerializer,
@@ -34,7 +52,8 @@ from .serializers import (
 )
 
 
-class CategoryViewSet(CreateListViewSet):
+class CategoryViewSet(CachedResponseMixin, SparseQuerysetMixin,
+                      CreateListViewSet):
     queryset = Category.objects.all()
     permission_classes = (IsAdminOrReadOnly,)
     serializer_class = CategorySerializer
@@ -42,9 +61,11 @@ class CategoryViewSet(CreateListViewSet):
     filter_backends = [filters.SearchFilter]
     search_fields = ["name"]
     lookup_field = "slug"
+    cache_namespaces = ("categories",)
 
 
-class GenreViewSet(CreateListViewSet):
+class GenreViewSet(CachedResponseMixin, SparseQuerysetMixin,
+                   CreateListViewSet):
     queryset = Genre.objects.all()
     permission_classes = (IsAdminOrReadOnly,)
     serializer_class = GenreSerializer
@@ -52,56 +73,205 @@ class GenreViewSet(CreateListViewSet):
     filter_backends = [filters.SearchFilter]
     search_fields = ["name"]
     lookup_field = "slug"
+    cache_namespaces = ("genres",)
 
 
-class TitleViewSet(ModelViewSet):
-    queryset = (Title.objects.annotate(rating=Avg('reviews__score'))
-                .order_by('category'))
+class TitleViewSet(CachedResponseMixin, ValuesListMixin, SparseQuerysetMixin,
+                   ModelViewSet):
+    queryset = (Title.objects.select_related('category')
+                .prefetch_related('genre')
+                .order_by('category_id', 'name', 'id'))
     permission_classes = (IsAdminOrReadOnly,)
+    pagination_class = CursorOrLimitOffsetPagination
+    cursor_ordering = ('category_id', 'name', 'id')
+    reader_class = TitleReader
     filterset_class = TitlesFilter
-    filter_backends = (DjangoFilterBackend,)
+    filter_backends = (DjangoFilterBackend, TitleSearchFilter)
     filterset_fields = ["category", "genre", "year", "name"]
+    cache_namespaces = ("titles",)
 
     def get_serializer_class(self):
         if self.action in ("create", "partial_update"):
             return TitlePostSerializer
         return TitleGetSerializer
 
+    def paginate_queryset(self, queryset):
+        # Курсор перестроил бы выдачу поиска по cursor_ordering
+        # и потерял бы сортировку по релевантности
+        search = self.request.query_params.get(
+            TitleSearchFilter.search_param, ""
+        )
+        if (
+            self.action == "list" and search.strip()
+            and self.paginator.cursor_requested(self.request)
+        ):
+            raise ValidationError({
+                "pagination": "Результаты поиска листаются через "
+                              "limit и offset.",
+            })
+        return super().paginate_queryset(queryset)
+
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        fields = self.request.query_params.get("fields", "").split(",")
+        context["with_histogram"] = (
+            self.action == "retrieve" or "histogram" in fields
+        )
+        return context
+
+    @cache_response
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @action(methods=["get"], detail=False, url_path="facets")
+    @cache_response
+    def facets(self, request):
+        """Количество произведений по жанрам, категориям и годам
+        для тех же параметров фильтрации, что и у списка."""
+        title_ids = (self.filter_queryset(self.get_queryset())
+                     .order_by().values("pk"))
+        return Response({
+            "genre": list(
+                Genre.objects.annotate(count=Count(
+                    "titles", filter=Q(titles__in=title_ids)
+                )).order_by("name").values("name", "slug", "count")
+            ),
+            "category": list(
+                Category.objects.annotate(count=Count(
+                    "titles", filter=Q(titles__in=title_ids)
+                )).order_by("name").values("name", "slug", "count")
+            ),
+            "year": list(
+                Title.objects.filter(pk__in=title_ids)
+                .order_by("year").values("year")
+                .annotate(count=Count("pk"))
+            ),
+        })
+
+    @action(methods=["get"], detail=False, url_path="top")
+    @cache_response
+    def top(self, request):
+        """Лучшие произведения из заранее рассчитанного рейтинга."""
+        queryset = (TopTitle.objects.select_related("title__category")
+                    .prefetch_related("title__genre"))
+        category = request.query_params.get("category")
+        if category:
+            queryset = queryset.filter(title__category__slug=category)
+        genre = request.query_params.get("genre")
+        if genre:
+            queryset = queryset.filter(title__genre__slug=genre)
+        min_reviews = request.query_params.get("min_reviews")
+        if min_reviews and min_reviews.isdigit():
+            queryset = queryset.filter(review_count__gte=int(min_reviews))
+        self.cursor_ordering = ("-score", "-review_count", "pk")
+        page = self.paginate_queryset(queryset)
+        serializer = TitleGetSerializer(
+            [top.title for top in page], many=True
+        )
+        return self.get_paginated_response(serializer.data)
 
-class ReviewViewSet(viewsets.ModelViewSet):
+
+class ReviewViewSet(CachedResponseMixin, ValuesListMixin, SparseQuerysetMixin,
+                    viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
+    reader_class = ReviewReader
     permission_classes = (AuthorOrAdminOrModeratorReadOnly,)
+    pagination_class = CursorOrLimitOffsetPagination
+    cursor_ordering = ('score', 'pub_date', 'id')
+    cache_namespaces = ('reviews', 'reviews:{title_id}')
+    sparse_required_fields = ('title',)
+
+    def get_title(self):
+        """Произведение из URL, загружается один раз за запрос."""
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title, id=self.kwargs.get('title_id')
+            )
+        return self._title
 
     def get_queryset(self):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, id=title_id)
-        return title.reviews.all()
+        return self.get_title().reviews.all()
+
+    @cache_response
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
 
     def perform_create(self, serializer):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, id=title_id)
-        serializer.save(author=self.request.user, title=title)
+        # Агрегаты рейтинга сдвигают сигналы Review в той же транзакции
+        with transaction.atomic():
+            serializer.save(author=self.request.user, title=self.get_title())
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            serializer.save()
 
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            # Повторное удаление (двойной клик) не удаляет строку
+            # и не должно второй раз вычитать оценку
+            if Review.objects.select_for_update().filter(
+                pk=instance.pk
+            ).exists():
+                instance.delete()
 
-class CommentViewSet(ModelViewSet):
+
+class CommentViewSet(ValuesListMixin, SparseQuerysetMixin, ModelViewSet):
     serializer_class = CommentSerializer
+    reader_class = CommentReader
     permission_classes = (AuthorOrAdminOrModeratorReadOnly,)
+    pagination_class = CursorOrLimitOffsetPagination
+    cursor_ordering = ('pub_date', 'id')
+    sparse_required_fields = ('review',)
+
+    def get_expand(self):
+        return parse_field_list(self.request.query_params.get("expand", ""))
+
+    def get_review(self):
+        """Отзыв из URL, проверенный на принадлежность произведению;
+        загружается одним запросом и один раз за запрос."""
+        if not hasattr(self, "_review"):
+            queryset = Review.objects.all()
+            if "review" in self.get_expand():
+                queryset = queryset.select_related("author")
+            self._review = get_object_or_404(
+                queryset,
+                id=self.kwargs.get("review_id"),
+                title_id=self.kwargs.get("title_id"),
+            )
+        return self._review
+
+    def get_paginated_response(self, data):
+        """С ``?expand=review`` отзыв выводится один раз на страницу,
+        а комментарии ссылаются на него по id."""
+        response = super().get_paginated_response(data)
+        if "review" in self.get_expand():
+            response.data["review"] = ReviewSerializer(self.get_review()).data
+        return response
 
     def get_queryset(self):
-        review = get_object_or_404(Review, id=self.kwargs.get("review_id"))
-        return review.comments.all()
+        return self.get_review().comments.select_related("author")
 
     def perform_create(self, serializer):
-        review_id = self.kwargs.get("review_id")
-        review = get_object_or_404(Review, pk=review_id)
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.get_review())
 
 
 class APISignup(APIView):
     """View для регистрации и создания пользователя
-    с последующей отсылкой confirmation code на email этого пользователя."""
+    с последующей отсылкой confirmation code на email этого пользователя.
+
+    Письмо ставится в очередь в одной транзакции с пользователем,
+    отправляет его команда ``send_emails``."""
 
     permission_classes = (AllowAny,)
+    throttle_classes = (SignupThrottle,)
 
     def post(self, request):
         serializer = SignupSerializer(data=request.data)
@@ -109,35 +279,82 @@ class APISignup(APIView):
         username = serializer.validated_data["username"]
         email = serializer.validated_data["email"]
 
-        username_exists = User.objects.filter(username=username).exists()
-        email_exists = User.objects.filter(email=email).exists()
-
-        if not username_exists and not email_exists:
-            user = User.objects.create(username=username, email=email)
-        else:
-            if not username_exists:
+        user, email_taken = self.find_owners(username, email)
+        with transaction.atomic():
+            if user is None and not email_taken:
+                try:
+                    with transaction.atomic():
+                        user = User.objects.create(
+                            username=username, email=email
+                        )
+                except IntegrityError:
+                    # Фильтр этого процесса ещё не знал о пользователе
+                    user, email_taken = self.find_owners(
+                        username, email, precheck=False
+                    )
+            if user is None:
                 return Response(
                     "Ошибка, email занят, просьба выбрать другой email.",
                     status=status.HTTP_400_BAD_REQUEST,
                 )
-            user = get_object_or_404(User, username=username)
             if user.email != email:
                 return Response(
                     "Ошибка, у пользователя другой email.",
                     status=status.HTTP_400_BAD_REQUEST,
                 )
-        token = default_token_generator.make_token(user)
-        send_mail(
-            subject="Ваш код для получения api-токена.",
-            message=f"Код: {token}",
-            from_email=DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            fail_silently=False,
-        )
+            token = default_token_generator.make_token(user)
+            enqueue_email(
+                subject="Ваш код для получения api-токена.",
+                message=f"Код: {token}",
+                from_email=DEFAULT_FROM_EMAIL,
+                recipient_list=[user.email],
+            )
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @staticmethod
+    def find_owners(username, email, precheck=True):
+        """Владелец имени и занят ли адрес кем-то другим.
+
+        Если по фильтру Блума ни имя, ни адрес точно не заняты, база не
+        запрашивается; иначе владельцы читаются одним запросом.
+        """
+        if precheck and not (
+            user_filter.might_contain("username", username)
+            or user_filter.might_contain("email", email)
+        ):
+            return None, False
+        user = None
+        email_taken = False
+        owners = User.objects.filter(Q(username=username) | Q(email=email))
+        for owner in owners[:2]:
+            if owner.username == username:
+                user = owner
+            else:
+                email_taken = True
+        return user, email_taken
+
 
-class UserViewSet(viewsets.ModelViewSet):
+class AvailabilityView(APIView):
+    """Свободно ли имя пользователя: ``?username=``.
+
+    Занятость email не сообщается, чтобы по ней нельзя было перебирать
+    зарегистрированные адреса.
+    """
+
+    permission_classes = (AllowAny,)
+    throttle_classes = (AvailabilityThrottle,)
+
+    def get(self, request):
+        username = request.query_params.get("username")
+        if not username:
+            return Response(
+                "Укажите username.",
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response({"username": not is_taken("username", username)})
+
+
+class UserViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     permission_classes = (IsAdmin,)
     serializer_class = UserSerializer
@@ -168,12 +385,34 @@ class UserViewSet(viewsets.ModelViewSet):
 
 class CodeConfirmView(APIView):
     permission_classes = [AllowAny]
+    throttle_classes = (TokenThrottle,)
 
     def post(self, request):
         serializer = TokenSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user = get_object_or_404(
-            User, username=serializer.validated_data.get("username")
-        )
-        token = AccessToken.for_user(user)
+        token = access_token_for(serializer.validated_data["user"])
         return Response(data={"token": str(token)}, status=status.HTTP_200_OK)
+
+
+class ExportView(APIView):
+    """Выгрузка таблицы потоком в формате static/data:
+    ``export/<таблица>.<csv|ndjson>[.gz]``."""
+
+    permission_classes = (IsAdmin,)
+
+    def get(self, request, table, file_format, compress=None):
+        if table not in TABLES_BY_NAME:
+            raise Http404
+        table = TABLES_BY_NAME[table]
+        compress = bool(compress)
+        response = StreamingHttpResponse(
+            export_stream(table, file_format, compress),
+            content_type=(
+                "application/gzip" if compress
+                else CONTENT_TYPES[file_format]
+            ),
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{table.file_name(file_format, compress)}"'
+        )
+        return response
@@ -84,7 +84,7 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "api.authentication.ClaimsJWTAuthentication",
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
     "PAGE_SIZE": 10,
@@ -116,8 +116,76 @@ EMAIL_HOST_USER = ""
 EMAIL_HOST_PASSWORD = ""
 DEFAULT_FROM_EMAIL = ""
 
+# Очередь писем: размер пачки, число попыток и задержка перед второй
+# попыткой в секундах (дальше удваивается)
+EMAIL_OUTBOX_BATCH_SIZE = 100
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = 60
+# Через сколько секунд забранные, но не отправленные письма (отправитель
+# упал) снова попадают в очередь
+EMAIL_OUTBOX_LEASE = 300
+
 AUTH_USER_MODEL = "reviews.User"
 
+# LocMemCache у каждого процесса свой. При нескольких воркерах нужен
+# общий кеш (memcached, redis), чтобы сбросы кеша ответов и версии
+# учётных данных видели все процессы
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+RESPONSE_CACHE_TIMEOUT = 300
+# Счётчики попаданий в кеш ответов ведутся в памяти процесса. Сводить
+# их в общий кеш (по RESPONSE_CACHE_STATS_FLUSH событий за раз) для
+# команды response_cache_stats можно только с кешем, где incr атомарен:
+# memcached или redis
+RESPONSE_CACHE_SHARED_STATS = False
+RESPONSE_CACHE_STATS_FLUSH = 100
+
+LEADERBOARD_MIN_REVIEWS = 3
+
+# Сколько секунд кешируется версия учётных данных пользователя:
+# не дольше этого срока отозванный токен может оставаться в силе
+AUTH_VERSION_CACHE_TIMEOUT = 30
+
+# Сколько проверенных JWT помнит каждый процесс
+VERIFIED_TOKEN_CACHE_SIZE = 1024
+
+# Фильтр Блума по именам и email пользователей: ожидаемое число
+# пользователей, доля ложных срабатываний, период в секундах, с которым
+# дочитываются новые пользователи, и размер пачки при чтении
+USER_FILTER_CAPACITY = 100000
+USER_FILTER_ERROR_RATE = 0.01
+USER_FILTER_MAX_AGE = 300
+USER_FILTER_CHUNK_SIZE = 2000
+
+# Ограничение частоты регистрации и выдачи токенов: правила
+# (ключ, алгоритм, лимит, период в секундах). Хранилище "memory" —
+# отдельно для каждого процесса, "sqlite" — общий файл для всех воркеров.
+THROTTLE_STORE = "memory"
+THROTTLE_SQLITE_PATH = os.path.join(BASE_DIR, "throttle.sqlite3")
+# Сколько ключей хранилище "memory" держит в каждом процессе
+THROTTLE_MEMORY_MAX_KEYS = 100000
+AUTH_THROTTLES = {
+    "signup": [
+        ("ip", "token_bucket", 10, 60),
+        ("ip", "sliding_window", 100, 3600),
+        ("username", "token_bucket", 5, 600),
+    ],
+    "token": [
+        ("ip", "token_bucket", 20, 60),
+        ("username", "sliding_window", 10, 600),
+    ],
+    "available": [
+        ("ip", "token_bucket", 30, 60),
+    ],
+}
+
+# Сколько строк выгрузка читает из базы и отдаёт одним куском
+EXPORT_CHUNK_SIZE = 2000
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=7),
 }
@@ -5,3 +5,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
 
 application = get_wsgi_application()
+
+# Фильтр Блума по пользователям строится при старте процесса,
+# а не на первом запросе регистрации
+from reviews.bloom import user_filter  # noqa: E402
+
+user_filter.warm_up()
@@ -0,0 +1,224 @@
+import math
+import time
+from hashlib import blake2b
+from threading import Lock
+
+from django.conf import settings
+from django.db import DatabaseError
+
+from .models import User
+
+
+class BloomFilter:
+    """Фильтр Блума: «точно нет» или «возможно есть».
+
+    Размер битового массива и число хеш-функций подбираются по
+    ожидаемому количеству элементов и допустимой доле ложных
+    срабатываний.
+    """
+
+    def __init__(self, capacity, error_rate):
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray(math.ceil(self.size / 8))
+        self.count = 0
+
+    def positions(self, value):
+        # Двойное хеширование: k позиций из двух 64-битных половин
+        digest = blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [
+            (first + number * second) % self.size
+            for number in range(self.hashes)
+        ]
+
+    def add(self, value):
+        for position in self.positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self.positions(value)
+        )
+
+    @property
+    def memory(self):
+        return len(self.bits)
+
+    def expected_error_rate(self):
+        """Доля ложных срабатываний при текущем числе элементов."""
+        return (
+            1 - math.exp(-self.hashes * self.count / self.size)
+        ) ** self.hashes
+
+
+class UserFilter:
+    """Фильтры Блума по именам и адресам пользователей процесса.
+
+    Строятся полным проходом по таблице при старте процесса
+    (``warm_up`` из wsgi.py) или, если не успели, при первом
+    обращении. Раз в USER_FILTER_MAX_AGE секунд дочитываются только
+    пользователи с id больше последнего прочитанного — так
+    подхватываются созданные другими процессами; дочитывание не
+    останавливает другие потоки. Новые пользователи этого процесса
+    добавляются сигналом сразу. Переименования в других процессах
+    фильтр не видит, поэтому отрицательный ответ означает, что значение
+    не занято с точностью до этого, положительный нужно проверять
+    запросом.
+    """
+
+    fields = ('username', 'email')
+
+    def __init__(self):
+        self.filters = None
+        self.built_at = 0
+        self.last_pk = 0
+        self._lock = Lock()
+        self._build_lock = Lock()
+        # Пользователи, добавленные во время перестроения: их может
+        # не оказаться в уже прочитанной выборке
+        self._pending = None
+
+    def read_users(self, filters, after_pk=0):
+        """Добавляет в ``filters`` пользователей с id больше
+        ``after_pk``; возвращает наибольший прочитанный id."""
+        last_pk = after_pk
+        rows = (
+            User.objects.filter(pk__gt=after_pk)
+            .values_list('pk', *self.fields)
+            .order_by()
+            .iterator(chunk_size=settings.USER_FILTER_CHUNK_SIZE)
+        )
+        for pk, *values in rows:
+            # Под блокировкой: в текущие фильтры параллельно пишет add()
+            with self._lock:
+                for field, value in zip(self.fields, values):
+                    filters[field].add(value)
+            last_pk = max(last_pk, pk)
+        return last_pk
+
+    def build(self):
+        """Строит новые фильтры и подменяет ими текущие.
+
+        Таблица читается без блокировки: пока идёт перестроение,
+        остальные потоки пользуются прежними фильтрами.
+        """
+        with self._lock:
+            self._pending = []
+        try:
+            total = User.objects.count()
+            capacity = max(settings.USER_FILTER_CAPACITY, 2 * total)
+            filters = {
+                field: BloomFilter(capacity, settings.USER_FILTER_ERROR_RATE)
+                for field in self.fields
+            }
+            last_pk = self.read_users(filters)
+        except BaseException:
+            with self._lock:
+                self._pending = None
+            raise
+        with self._lock:
+            for row in self._pending:
+                for field, value in zip(self.fields, row):
+                    filters[field].add(value)
+            self._pending = None
+            self.filters = filters
+            self.last_pk = last_pk
+            self.built_at = time.monotonic()
+
+    def refresh(self):
+        """Дочитывает новых пользователей в текущие фильтры; если их
+        стало больше ёмкости, фильтры строятся заново."""
+        filters = self.filters
+        if filters is None:
+            return
+        self.last_pk = self.read_users(filters, self.last_pk)
+        self.built_at = time.monotonic()
+        if any(bloom.count > bloom.capacity for bloom in filters.values()):
+            self.build()
+
+    def warm_up(self):
+        """Строит фильтры до первого запроса. Если база недоступна
+        (например, ещё не применены миграции), построение откладывается
+        до первого обращения."""
+        try:
+            with self._build_lock:
+                self.build()
+        except DatabaseError:
+            pass
+
+    def is_stale(self):
+        return (
+            time.monotonic() - self.built_at > settings.USER_FILTER_MAX_AGE
+        )
+
+    def get_filters(self):
+        filters = self.filters
+        if filters is not None and not self.is_stale():
+            return filters
+        if filters is None:
+            # Фильтры не построены при старте: без них отвечать нечем, ждём
+            with self._build_lock:
+                if self.filters is None:
+                    self.build()
+                return self.filters
+        # Новых пользователей дочитывает один поток, остальные
+        # продолжают работать с текущими фильтрами
+        if self._build_lock.acquire(blocking=False):
+            try:
+                if self.is_stale():
+                    self.refresh()
+            finally:
+                self._build_lock.release()
+        return self.filters
+
+    def might_contain(self, field, value):
+        return value in self.get_filters()[field]
+
+    def add(self, user):
+        values = [getattr(user, field) for field in self.fields]
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(values)
+            if self.filters is None:
+                return
+            for field, value in zip(self.fields, values):
+                self.filters[field].add(value)
+
+    def reset(self):
+        with self._lock:
+            self.filters = None
+            self.last_pk = 0
+
+    def stats(self):
+        filters = self.get_filters()
+        return {
+            field: {
+                'count': bloom.count,
+                'capacity': bloom.capacity,
+                'bits': bloom.size,
+                'hashes': bloom.hashes,
+                'memory': bloom.memory,
+                'error_rate': bloom.error_rate,
+                'expected_error_rate': bloom.expected_error_rate(),
+            }
+            for field, bloom in filters.items()
+        }
+
+
+user_filter = UserFilter()
+
+
+def is_taken(field, value):
+    """Занято ли имя или адрес; в базу идёт только при «возможно»."""
+    if not user_filter.might_contain(field, value):
+        return False
+    return User.objects.filter(**{field: value}).exists()
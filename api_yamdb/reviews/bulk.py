@@ -0,0 +1,115 @@
+from contextlib import contextmanager
+
+from django.core.management.color import no_style
+from django.db import connections, router
+
+
+def bulk_create_with_pks(model, objs, batch_size=None):
+    """``bulk_create``, после которого у объектов заполнены первичные ключи.
+
+    Если база не возвращает id из массовой вставки (SQLite), ключи
+    выбираются по максимальным id после вставки: вызывать внутри
+    транзакции, где запись держит блокировку таблицы, а id растут
+    монотонно (AUTOINCREMENT).
+    """
+    objs = list(objs)
+    if not objs:
+        return objs
+    using = router.db_for_write(model)
+    model.objects.using(using).bulk_create(objs, batch_size=batch_size)
+    if connections[using].features.can_return_ids_from_bulk_insert:
+        return objs
+    pks = sorted(
+        model.objects.using(using)
+        .order_by('-pk')
+        .values_list('pk', flat=True)[:len(objs)]
+    )
+    for obj, pk in zip(objs, pks):
+        obj.pk = pk
+        obj._state.adding = False
+        obj._state.db = using
+    return objs
+
+
+@contextmanager
+def explicit_auto_dates(model):
+    """Даёт вставить свои значения в поля ``auto_now_add`` модели."""
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def bulk_upsert(model, objs, update_fields, batch_size=None):
+    """Вставляет новые объекты и обновляет существующие по первичному
+    ключу. Возвращает пару (создано, обновлено)."""
+    objs = list(objs)
+    manager = model._base_manager.using(router.db_for_write(model))
+    existing = set(
+        manager.filter(pk__in=[obj.pk for obj in objs])
+        .values_list('pk', flat=True)
+    )
+    created = [obj for obj in objs if obj.pk not in existing]
+    updated = [obj for obj in objs if obj.pk in existing]
+    with explicit_auto_dates(model):
+        manager.bulk_create(created, batch_size=batch_size)
+    if updated and update_fields:
+        manager.bulk_update(updated, update_fields, batch_size=batch_size)
+    return len(created), len(updated)
+
+
+def reset_sequences(models, using):
+    """Сдвигает счётчики id после вставки с явными ключами
+    (SQLite берёт следующий id из таблицы сам)."""
+    connection = connections[using]
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+
+def insert_rows(model, fields, rows, using=None):
+    """Вставляет кортежи значений полей ``fields`` (``attname``) одним
+    ``executemany``: без объектов модели, сигналов и разбиения на
+    составные INSERT. Остальные поля получают значения по умолчанию,
+    вычисленные один раз на вызов. Возвращает число строк."""
+    using = using or router.db_for_write(model)
+    connection = connections[using]
+    by_attname = {
+        field.attname: field for field in model._meta.concrete_fields
+    }
+    model_fields = [by_attname[name] for name in fields]
+    defaults = [
+        (field, field.get_db_prep_save(field.get_default(), connection))
+        for field in model._meta.concrete_fields
+        if field.attname not in fields and not field.primary_key
+    ]
+    columns = [field.column for field in model_fields] + [
+        field.column for field, _ in defaults
+    ]
+    default_values = [value for _, value in defaults]
+    quote = connection.ops.quote_name
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        quote(model._meta.db_table),
+        ', '.join(quote(column) for column in columns),
+        ', '.join(['%s'] * len(columns)),
+    )
+    params = [
+        [
+            field.get_db_prep_save(value, connection)
+            for field, value in zip(model_fields, row)
+        ] + default_values
+        for row in rows
+    ]
+    if params:
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, params)
+    return len(params)
@@ -0,0 +1,359 @@
+import csv
+import gzip
+import io
+import json
+import os
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from itertools import islice
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS
+
+from .bloom import user_filter
+from .bulk import reset_sequences
+from .models import Category, Comment, Genre, Review, Title, User
+from .search import fts_enabled
+from .signals import data_loaded
+
+DATA_DIR = os.path.join(settings.BASE_DIR, 'static', 'data')
+FORMATS = ('csv', 'ndjson')
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
+# Размер блока при поиске границ записей
+SCAN_BLOCK_SIZE = 1 << 20
+
+
+class Table:
+    """Соответствие CSV-файла из static/data модели.
+
+    ``columns`` сопоставляет столбцам файла атрибуты модели (``attname``,
+    для внешних ключей — ``<поле>_id``). Строка файла разбирается в
+    кортеж значений в порядке ``fields``; из кортежей строятся объекты.
+    """
+
+    def __init__(self, name, model, columns, parallel=False):
+        self.name = name
+        self.model = model
+        self.columns = columns
+        self.parallel = parallel
+        self.fields = tuple(columns.values())
+        by_attname = {
+            field.attname: field for field in model._meta.concrete_fields
+        }
+        self.model_fields = [by_attname[name] for name in self.fields]
+
+    def file_name(self, file_format='csv', compress=False):
+        return f'{self.name}.{file_format}' + ('.gz' if compress else '')
+
+    def find_file(self, directory):
+        """Путь к файлу таблицы: ``<имя>.csv`` или ``<имя>.ndjson``,
+        возможно сжатый gzip."""
+        for file_format in FORMATS:
+            for compress in (False, True):
+                path = os.path.join(
+                    directory, self.file_name(file_format, compress)
+                )
+                if os.path.exists(path):
+                    return path
+        return None
+
+    @property
+    def update_fields(self):
+        return [
+            field.name for field in self.model_fields if not field.primary_key
+        ]
+
+    def parse(self, row):
+        values = []
+        for column, field in zip(self.columns, self.model_fields):
+            raw = row[column]
+            if raw in ('', None) and field.null:
+                values.append(None)
+                continue
+            value = field.to_python(raw)
+            if not field.is_relation:
+                field.run_validators(value)
+            values.append(value)
+        return tuple(values)
+
+    def build(self, values):
+        return self.model(**dict(zip(self.fields, values)))
+
+
+TABLES = (
+    Table('users', User, {
+        'id': 'id',
+        'username': 'username',
+        'email': 'email',
+        'role': 'role',
+        'bio': 'bio',
+        'first_name': 'first_name',
+        'last_name': 'last_name',
+    }),
+    Table('category', Category, {'id': 'id', 'name': 'name', 'slug': 'slug'}),
+    Table('genre', Genre, {'id': 'id', 'name': 'name', 'slug': 'slug'}),
+    Table('titles', Title, {
+        'id': 'id',
+        'name': 'name',
+        'year': 'year',
+        'category': 'category_id',
+    }),
+    Table('genre_title', Title.genre.through, {
+        'id': 'id',
+        'title_id': 'title_id',
+        'genre_id': 'genre_id',
+    }),
+    Table('review', Review, {
+        'id': 'id',
+        'title_id': 'title_id',
+        'text': 'text',
+        'author': 'author_id',
+        'score': 'score',
+        'pub_date': 'pub_date',
+    }, parallel=True),
+    Table('comments', Comment, {
+        'id': 'id',
+        'review_id': 'review_id',
+        'text': 'text',
+        'author': 'author_id',
+        'pub_date': 'pub_date',
+    }, parallel=True),
+)
+TABLES_BY_NAME = {table.name: table for table in TABLES}
+
+
+def is_csv(path):
+    return path.endswith(('.csv', '.csv.gz'))
+
+
+def is_compressed(path):
+    return path.endswith('.gz')
+
+
+def read_json_lines(lines):
+    return (json.loads(line) for line in lines if line.strip())
+
+
+def read_rows(table, path):
+    """Построчно разбирает файл в кортежи значений."""
+    opener = gzip.open if is_compressed(path) else open
+    with opener(path, 'rt', newline='', encoding='utf-8') as file:
+        rows = csv.DictReader(file) if is_csv(path) else read_json_lines(file)
+        for row in rows:
+            yield table.parse(row)
+
+
+def record_boundaries(path, chunk_bytes):
+    """Смещения, по которым файл делится на диапазоны целых записей
+    размером около ``chunk_bytes``; первое — начало данных после
+    заголовка CSV, последнее — размер файла.
+
+    Строка NDJSON — всегда целая запись. В CSV перевод строки может
+    быть внутри кавычек, поэтому граница ищется на переводе строки при
+    чётном числе кавычек от начала файла: для этого файл один раз
+    читается последовательно, но без разбора.
+    """
+    quoted = is_csv(path)
+    boundaries = [] if quoted else [0]
+    target = 0 if quoted else chunk_bytes
+    inside = False
+    offset = 0
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(SCAN_BLOCK_SIZE), b''):
+            checked = 0
+            position = target - offset
+            while position < len(block):
+                newline = block.find(b'\n', max(position, 0))
+                if newline == -1:
+                    break
+                if quoted:
+                    inside ^= bool(block.count(b'"', checked, newline) & 1)
+                    checked = newline
+                if inside:
+                    position = newline + 1
+                    continue
+                boundaries.append(offset + newline + 1)
+                target = offset + newline + 1 + chunk_bytes
+                position = target - offset
+            if quoted:
+                inside ^= bool(block.count(b'"', checked) & 1)
+            offset += len(block)
+    if not boundaries or boundaries[-1] != offset:
+        boundaries.append(offset)
+    return boundaries
+
+
+def read_header(path, start):
+    with open(path, 'rb') as file:
+        return next(csv.reader([file.read(start).decode('utf-8')]))
+
+
+def parse_range(name, path, start, end, header):
+    """Разбирает записи файла в диапазоне байтов ``[start, end)``.
+
+    Выполняется в процессах пула, поэтому получает только имя таблицы
+    и возвращает кортежи значений без обращений к базе.
+    """
+    table = TABLES_BY_NAME[name]
+    with open(path, 'rb') as file:
+        file.seek(start)
+        text = file.read(end - start).decode('utf-8')
+    if header is None:
+        # Только '\n', как в record_boundaries: splitlines() режет и по
+        # U+2028, NEL и другим символам, которые json.dumps с
+        # ensure_ascii=False оставляет внутри строк
+        rows = read_json_lines(text.split('\n'))
+    else:
+        rows = (
+            dict(zip(header, row))
+            for row in csv.reader(io.StringIO(text, newline=''))
+        )
+    try:
+        return [table.parse(row) for row in rows]
+    except Exception as error:
+        raise ValueError(
+            f'{path}, байты {start}-{end}: {error}'
+        ) from None
+
+
+def setup_worker():
+    if not apps.ready:
+        django.setup()
+
+
+def read_rows_parallel(table, path, workers, chunk_bytes):
+    """Кортежи значений файла, разобранного пулом из ``workers``
+    процессов по диапазонам байтов.
+
+    Порядок записей сохраняется; в работе одновременно не больше
+    ``2 * workers`` диапазонов, так что память не зависит от размера
+    файла, даже если запись в базу отстаёт от разбора. Сжатый файл
+    на диапазоны не делится и читается в основном процессе.
+    """
+    if is_compressed(path):
+        yield from read_rows(table, path)
+        return
+    boundaries = record_boundaries(path, chunk_bytes)
+    header = read_header(path, boundaries[0]) if is_csv(path) else None
+    ranges = list(zip(boundaries, boundaries[1:]))
+    if workers <= 1 or len(ranges) <= 1:
+        for start, end in ranges:
+            yield from parse_range(table.name, path, start, end, header)
+        return
+    with ProcessPoolExecutor(workers, initializer=setup_worker) as executor:
+        pending = deque()
+        ranges = iter(ranges)
+        for start, end in islice(ranges, 2 * workers):
+            pending.append(executor.submit(
+                parse_range, table.name, path, start, end, header
+            ))
+        while pending:
+            rows = pending.popleft().result()
+            for start, end in islice(ranges, 1):
+                pending.append(executor.submit(
+                    parse_range, table.name, path, start, end, header
+                ))
+            yield from rows
+
+
+def batches(rows, batch_size):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def refresh_derived(names, stdout, sender):
+    """Доводит базу до согласованного состояния после массовой вставки
+    таблиц ``names``: сдвигает счётчики id и пересчитывает то, что
+    модели поддерживают сигналами, которые ``bulk_create`` не вызывает.
+    """
+    reset_sequences(
+        [TABLES_BY_NAME[name].model for name in names], DEFAULT_DB_ALIAS
+    )
+    if 'users' in names:
+        user_filter.reset()
+    if 'titles' in names and fts_enabled():
+        call_command('rebuild_search_index', stdout=stdout)
+    if names & {'titles', 'review'}:
+        call_command('rebuild_ratings', stdout=stdout)
+        call_command('rebuild_top_titles', stdout=stdout)
+    data_loaded.send(sender=sender, tables=names)
+
+
+def format_value(value):
+    """Значение столбца в том виде, в каком оно лежит в static/data."""
+    if isinstance(value, datetime):
+        return value.astimezone(timezone.utc).isoformat().replace(
+            '+00:00', 'Z'
+        )
+    return value
+
+
+def export_rows(table, chunk_size):
+    """Строки таблицы в порядке id, ``chunk_size`` за обращение к базе."""
+    rows = (
+        table.model._base_manager.order_by('pk')
+        .values_list(*table.fields)
+        .iterator(chunk_size=chunk_size)
+    )
+    for row in rows:
+        yield [format_value(value) for value in row]
+
+
+def export_chunks(table, file_format, chunk_size):
+    """Текст файла таблицы кусками по ``chunk_size`` строк."""
+    columns = list(table.columns)
+    rows = export_rows(table, chunk_size)
+    if file_format == 'ndjson':
+        for batch in batches(rows, chunk_size):
+            yield ''.join(
+                json.dumps(dict(zip(columns, row)), ensure_ascii=False) + '\n'
+                for row in batch
+            )
+        return
+    header = True
+    for batch in batches(rows, chunk_size):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        if header:
+            writer.writerow(columns)
+            header = False
+        writer.writerows(
+            ['' if value is None else value for value in row]
+            for row in batch
+        )
+        yield buffer.getvalue()
+    if header:
+        yield ','.join(columns) + '\n'
+
+
+def export_stream(table, file_format='csv', compress=False,
+                  chunk_size=None):
+    """Байты файла таблицы в формате загрузчика; при ``compress`` —
+    поток gzip. Память не зависит от размера таблицы."""
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    chunks = (
+        chunk.encode() for chunk in export_chunks(
+            table, file_format, chunk_size
+        )
+    )
+    if not compress:
+        yield from chunks
+        return
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
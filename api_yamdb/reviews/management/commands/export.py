@@ -0,0 +1,81 @@
+import os
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.csv_data import FORMATS, TABLES, TABLES_BY_NAME, export_stream
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает таблицы в файлы в формате static/data (CSV или NDJSON, '
+        'по желанию сжатые gzip); их можно загрузить обратно load_csv.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'tables',
+            nargs='*',
+            help='Какие таблицы выгрузить (по умолчанию все): '
+            + ', '.join(TABLES_BY_NAME),
+        )
+        parser.add_argument(
+            '--output',
+            default='.',
+            help='Каталог для файлов.',
+        )
+        parser.add_argument(
+            '--format',
+            dest='file_format',
+            choices=FORMATS,
+            default='csv',
+            help='Формат файлов.',
+        )
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help='Сжимать файлы gzip.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=settings.EXPORT_CHUNK_SIZE,
+            help='Количество строк, читаемых из базы за раз.',
+        )
+
+    def handle(self, *args, **options):
+        names = set(options['tables']) or set(TABLES_BY_NAME)
+        unknown = names - set(TABLES_BY_NAME)
+        if unknown:
+            raise CommandError(f'Неизвестные таблицы: {", ".join(unknown)}')
+        os.makedirs(options['output'], exist_ok=True)
+        total = 0
+        for table in TABLES:
+            if table.name in names:
+                total += self.export(table, options)
+        self.stdout.write(self.style.SUCCESS(f'Выгружено строк: {total}'))
+
+    def export(self, table, options):
+        path = os.path.join(
+            options['output'],
+            table.file_name(options['file_format'], options['gzip']),
+        )
+        started = perf_counter()
+        rows = table.model._base_manager.count()
+        size = 0
+        # Пишем во временный файл, чтобы не оставить половину выгрузки
+        with open(f'{path}.tmp', 'wb') as file:
+            for chunk in export_stream(
+                table, options['file_format'], options['gzip'],
+                options['chunk_size'],
+            ):
+                file.write(chunk)
+                size += len(chunk)
+        os.replace(f'{path}.tmp', path)
+        elapsed = perf_counter() - started
+        self.stdout.write(
+            f'{path}: {rows} строк, {size} байт за {elapsed:.2f} с, '
+            f'{rows / max(elapsed, 1e-9):.0f} строк/с'
+        )
+        return rows
@@ -0,0 +1,88 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+
+from reviews.bulk import insert_rows
+from reviews.csv_data import TABLES, batches, refresh_derived
+from reviews.synthetic import SyntheticData
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт синтетические данные для нагрузочных тестов: при одном '
+        'зерне и одних параметрах — одни и те же строки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', default='0', help='Зерно генератора.')
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--genres', type=int, default=30)
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument(
+            '--reviews',
+            type=int,
+            default=20000,
+            help='Сколько отзывов распределить по произведениям; у одного '
+            'произведения не больше отзывов, чем пользователей.',
+        )
+        parser.add_argument('--comments', type=int, default=20000)
+        parser.add_argument(
+            '--skew',
+            type=float,
+            default=1.1,
+            help='Показатель закона Ципфа для популярности произведений, '
+            'активности пользователей и обсуждаемости отзывов.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Количество строк в одной пачке вставки.',
+        )
+
+    def handle(self, *args, **options):
+        data = SyntheticData(
+            seed=options['seed'],
+            users=options['users'],
+            categories=options['categories'],
+            genres=options['genres'],
+            titles=options['titles'],
+            reviews=options['reviews'],
+            comments=options['comments'],
+            skew=options['skew'],
+            start_ids={
+                table.name: self.next_id(table.model) for table in TABLES
+            },
+        )
+        total = 0
+        for table in TABLES:
+            total += self.insert(data, table.name, options['batch_size'])
+        refresh_derived(
+            {table.name for table in TABLES}, self.stdout,
+            sender=self.__class__,
+        )
+        self.stdout.write(self.style.SUCCESS(f'Создано строк: {total}'))
+
+    @staticmethod
+    def next_id(model):
+        return (
+            model._base_manager.aggregate(last=Max('pk'))['last'] or 0
+        ) + 1
+
+    def insert(self, data, name, batch_size):
+        started = perf_counter()
+        count = 0
+        model, fields = data.FIELDS[name]
+        rows = getattr(data, name)()
+        with transaction.atomic():
+            for batch in batches(rows, batch_size):
+                count += insert_rows(model, fields, batch)
+        elapsed = perf_counter() - started
+        self.stdout.write(
+            f'{name}: {count} строк за {elapsed:.2f} с, '
+            f'{count / max(elapsed, 1e-9):.0f} строк/с'
+        )
+        return count
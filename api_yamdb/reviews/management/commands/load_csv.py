@@ -0,0 +1,106 @@
+import os
+from time import perf_counter
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from reviews.bulk import bulk_upsert
+from reviews.csv_data import (
+    DATA_DIR, TABLES, TABLES_BY_NAME, batches, read_rows, read_rows_parallel,
+    refresh_derived,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает CSV- или NDJSON-файлы из static/data в базу: по одной '
+        'транзакции на файл, в порядке зависимостей. Повторный запуск '
+        'обновляет уже загруженные строки по id.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'tables',
+            nargs='*',
+            help='Какие файлы загрузить (по умолчанию все): '
+            + ', '.join(TABLES_BY_NAME),
+        )
+        parser.add_argument(
+            '--path',
+            default=DATA_DIR,
+            help='Каталог с CSV-файлами.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество строк в одной пачке вставки.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count(),
+            help='Процессов для разбора отзывов и комментариев '
+            '(1 — разбирать в основном процессе).',
+        )
+        parser.add_argument(
+            '--chunk-bytes',
+            type=int,
+            default=8 << 20,
+            help='Размер диапазона файла, который разбирает один процесс.',
+        )
+
+    def handle(self, *args, **options):
+        names = set(options['tables']) or set(TABLES_BY_NAME)
+        unknown = names - set(TABLES_BY_NAME)
+        if unknown:
+            raise CommandError(f'Неизвестные файлы: {", ".join(unknown)}')
+        tables = [table for table in TABLES if table.name in names]
+        paths = {}
+        for table in tables:
+            paths[table] = table.find_file(options['path'])
+            if paths[table] is None:
+                raise CommandError(
+                    f'Файл не найден: {table.name}.csv в {options["path"]}'
+                )
+
+        total = 0
+        for table in tables:
+            if table.parallel:
+                rows = read_rows_parallel(
+                    table, paths[table],
+                    options['workers'], options['chunk_bytes'],
+                )
+            else:
+                rows = read_rows(table, paths[table])
+            try:
+                total += self.load(table, rows, options['batch_size'])
+            except (ValueError, ValidationError) as error:
+                raise CommandError(error)
+        refresh_derived(names, self.stdout, sender=self.__class__)
+        self.stdout.write(self.style.SUCCESS(f'Загружено строк: {total}'))
+
+    def load(self, table, rows, batch_size):
+        """Пишет кортежи значений в базу пачками в одной транзакции;
+        разбор может идти параллельно, но пишет только этот процесс."""
+        started = perf_counter()
+        created = updated = 0
+        with transaction.atomic():
+            for batch in batches(rows, batch_size):
+                batch_created, batch_updated = bulk_upsert(
+                    table.model,
+                    [table.build(values) for values in batch],
+                    table.update_fields,
+                )
+                created += batch_created
+                updated += batch_updated
+        self.report(table.name, created, updated, perf_counter() - started)
+        return created + updated
+
+    def report(self, name, created, updated, elapsed):
+        total = created + updated
+        self.stdout.write(
+            f'{name}: {total} строк (новых {created}, обновлено {updated}) '
+            f'за {elapsed:.2f} с, {total / max(elapsed, 1e-9):.0f} строк/с'
+        )
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.models import Title
+from reviews.ratings import rebuild_ratings
+from reviews.signals import titles_changed
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рейтинги произведений по отзывам пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Количество произведений в одной транзакции.',
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        last_id = 0
+        total = 0
+        while True:
+            title_ids = list(
+                Title.objects.filter(pk__gt=last_id)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:chunk_size]
+            )
+            if not title_ids:
+                break
+            with transaction.atomic():
+                total += rebuild_ratings(title_ids)
+            last_id = title_ids[-1]
+        titles_changed.send(sender=Title)
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано произведений: {total}')
+        )
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from reviews.models import Title
+from reviews.search import clear_index, fts_enabled, index_titles
+from reviews.signals import titles_changed
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс произведений пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество произведений в одной пачке.',
+        )
+
+    def handle(self, *args, **options):
+        if not fts_enabled():
+            raise CommandError(
+                'Полнотекстовый индекс недоступен для этой базы данных.'
+            )
+        batch_size = options['batch_size']
+        clear_index()
+        last_id = 0
+        total = 0
+        while True:
+            rows = list(
+                Title.objects.filter(pk__gt=last_id)
+                .order_by('pk')
+                .values_list('pk', 'name', 'description')[:batch_size]
+            )
+            if not rows:
+                break
+            with transaction.atomic():
+                index_titles(rows)
+            total += len(rows)
+            last_id = rows[-1][0]
+        titles_changed.send(sender=Title)
+        self.stdout.write(
+            self.style.SUCCESS(f'Проиндексировано произведений: {total}')
+        )
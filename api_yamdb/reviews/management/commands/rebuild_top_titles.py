@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.models import Title
+from reviews.ratings import rebuild_top_titles
+from reviews.signals import titles_changed
+
+
+class Command(BaseCommand):
+    help = (
+        'Заново заполняет рейтинг лучших произведений. Нужно запускать '
+        'после изменения настройки LEADERBOARD_MIN_REVIEWS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество записей в одном INSERT.',
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            total = rebuild_top_titles(options['batch_size'])
+        titles_changed.send(sender=Title)
+        self.stdout.write(
+            self.style.SUCCESS(f'Произведений в рейтинге: {total}')
+        )
@@ -0,0 +1,42 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from reviews.outbox import drain
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет письма из очереди пачками, по одному соединению '
+        'с почтовым сервером на пачку. Неудачные письма повторяются '
+        'с растущей задержкой.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            help='Количество писем в одной пачке.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help=(
+                'Работать постоянно, проверяя очередь с этим интервалом '
+                'в секундах. По умолчанию очередь разбирается один раз.'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = drain(options['batch_size'])
+            if sent or failed or not options['interval']:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Отправлено писем: {sent}, отложено: {failed}'
+                ))
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
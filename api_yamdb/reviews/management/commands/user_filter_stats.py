@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from reviews.bloom import user_filter
+
+
+class Command(BaseCommand):
+    help = (
+        'Строит фильтр Блума по именам и email пользователей и показывает '
+        'его размер и ожидаемую долю ложных срабатываний.'
+    )
+
+    def handle(self, *args, **options):
+        user_filter.build()
+        for field, stats in user_filter.stats().items():
+            self.stdout.write(
+                f'{field}: элементов {stats["count"]} из {stats["capacity"]}, '
+                f'{stats["bits"]} бит, хешей {stats["hashes"]}, '
+                f'память {stats["memory"] / 1024:.1f} КиБ, '
+                f'ложных срабатываний {stats["expected_error_rate"]:.3%} '
+                f'(цель {stats["error_rate"]:.3%})'
+            )
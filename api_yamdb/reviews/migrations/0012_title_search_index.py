@@ -0,0 +1,29 @@
+from django.db import migrations
+
+from reviews.search import create_index, drop_index, index_titles
+
+
+def create_search_index(apps, schema_editor):
+    create_index(schema_editor.connection)
+    Title = apps.get_model('reviews', 'Title')
+    index_titles(
+        Title.objects.using(schema_editor.connection.alias)
+        .values_list('pk', 'name', 'description')
+        .iterator(),
+        using=schema_editor.connection.alias,
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    drop_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_title_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
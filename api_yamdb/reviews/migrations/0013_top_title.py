@@ -0,0 +1,48 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_top_titles(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    TopTitle = apps.get_model('reviews', 'TopTitle')
+    TopTitle.objects.bulk_create(
+        TopTitle(
+            title_id=pk,
+            score=rating_sum / rating_count,
+            review_count=rating_count,
+        )
+        for pk, rating_sum, rating_count in Title.objects.filter(
+            rating_count__gte=settings.LEADERBOARD_MIN_REVIEWS
+        ).values_list('pk', 'rating_sum', 'rating_count')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0012_title_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TopTitle',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='top', serialize=False, to='reviews.Title', verbose_name='Произведение')),
+                ('score', models.FloatField(verbose_name='Средняя оценка')),
+                ('review_count', models.PositiveIntegerField(verbose_name='Количество отзывов')),
+            ],
+            options={
+                'verbose_name': 'Место в рейтинге',
+                'verbose_name_plural': 'Рейтинг произведений',
+                'ordering': ('-score', '-review_count', 'title'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='toptitle',
+            index=models.Index(fields=['-score', '-review_count'], name='top_title_rank'),
+        ),
+        migrations.RunPython(fill_top_titles, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0014_title_score_histogram'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['review', 'pub_date'], name='comment_review_date'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['title', 'score', 'pub_date'], name='review_title_score_date'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', 'name'], name='title_category_name'),
+        ),
+        # У автоматической промежуточной модели нет Meta.indexes
+        migrations.RunSQL(
+            'CREATE INDEX genre_title_genre ON reviews_title_genre (genre_id, title_id)',
+            'DROP INDEX genre_title_genre',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0016_outgoing_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='auth_version',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Версия учётных данных'),
+        ),
+    ]
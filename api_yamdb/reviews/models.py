@@ -2,9 +2,13 @@ from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db.models import UniqueConstraint
+from django.utils import timezone
 
 from .validators import validation_of_the_year
 
+SCORES = range(1, 11)
+SCORE_COUNT_FIELDS = tuple(f'score_{score}_count' for score in SCORES)
+
 
 class UserRoles:
     USER = 'user'
@@ -57,6 +61,11 @@ class User(AbstractUser):
         max_length=150,
         verbose_name='Фамилия',
     )
+    auth_version = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Версия учётных данных',
+    )
 
     class Meta:
         verbose_name = 'Пользователь',
@@ -66,6 +75,14 @@ class User(AbstractUser):
             UniqueConstraint(fields=['username', ], name='username')
         ]
 
+    def refresh_from_db(self, using=None, fields=None):
+        # Пользователь, собранный из токена, при обращении к любому
+        # отложенному полю дозагружает их все одним запросом.
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred.issuperset(fields):
+            fields = deferred
+        super().refresh_from_db(using, fields)
+
     @property
     def is_admin(self):
         return self.role == UserRoles.ADMIN
@@ -127,14 +144,66 @@ class Title(models.Model):
         blank=True,
         null=True,
     )
+    rating_sum = models.PositiveIntegerField(
+        verbose_name="Сумма оценок", default=0, editable=False
+    )
+    rating_count = models.PositiveIntegerField(
+        verbose_name="Количество оценок", default=0, editable=False
+    )
+    rating = models.PositiveSmallIntegerField(
+        verbose_name="Рейтинг", blank=True, null=True, editable=False
+    )
+    score_1_count = models.PositiveIntegerField(
+        verbose_name="Количество оценок 1", default=0, editable=False
+    )
+    score_2_count = models.PositiveIntegerField(
+        verbose_name="Количество оценок 2", default=0, editable=False
+    )
+    score_3_count = models.PositiveIntegerField(
+        verbose_name="Количество оценок 3", default=0, editable=False
+    )
+    score_4_count = models.PositiveIntegerField(
+        verbose_name="Количество оценок 4", default=0, editable=False
+    )
+    score_5_count = models.PositiveIntegerField(
+        verbose_name="Количество оценок 5", default=0, editable=False
+    )
+    score_6_count = models.PositiveIntegerField(
+        verbose_name="Количество оценок 6", default=0, editable=False
+    )
+    score_7_count = models.PositiveIntegerField(
+        verbose_name="Количество оценок 7", default=0, editable=False
+    )
+    score_8_count = models.PositiveIntegerField(
+        verbose_name="Количество оценок 8", default=0, editable=False
+    )
+    score_9_count = models.PositiveIntegerField(
+        verbose_name="Количество оценок 9", default=0, editable=False
+    )
+    score_10_count = models.PositiveIntegerField(
+        verbose_name="Количество оценок 10", default=0, editable=False
+    )
 
     class Meta:
         verbose_name = "Произведение"
         ordering = ["name"]
+        indexes = [
+            models.Index(
+                fields=["category", "name"], name="title_category_name"
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    @property
+    def histogram(self):
+        """Количество отзывов с каждой оценкой от 1 до 10."""
+        return {
+            score: getattr(self, field)
+            for score, field in zip(SCORES, SCORE_COUNT_FIELDS)
+        }
+
 
 class Review(models.Model):
     title = models.ForeignKey(
@@ -167,6 +236,12 @@ class Review(models.Model):
 
     class Meta:
         ordering = ('score', 'pub_date')
+        indexes = (
+            models.Index(
+                fields=('title', 'score', 'pub_date'),
+                name='review_title_score_date',
+            ),
+        )
         constraints = (
             models.UniqueConstraint(
                 fields=('title', 'author'),
@@ -206,6 +281,74 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('pub_date',)
+        indexes = (
+            models.Index(
+                fields=('review', 'pub_date'), name='comment_review_date'
+            ),
+        )
 
     def __str__(self):
         return self.text[:15]
+
+
+class TopTitle(models.Model):
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='top',
+        verbose_name='Произведение',
+    )
+    score = models.FloatField(verbose_name='Средняя оценка')
+    review_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов'
+    )
+
+    class Meta:
+        verbose_name = 'Место в рейтинге'
+        verbose_name_plural = 'Рейтинг произведений'
+        ordering = ('-score', '-review_count', 'title')
+        indexes = (
+            models.Index(
+                fields=('-score', '-review_count'), name='top_title_rank'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.title_id}: {self.score:.2f}'
+
+
+class OutgoingEmail(models.Model):
+    subject = models.CharField(verbose_name='Тема', max_length=255)
+    body = models.TextField(verbose_name='Текст')
+    from_email = models.CharField(
+        verbose_name='Отправитель', max_length=254, blank=True
+    )
+    recipient = models.EmailField(verbose_name='Получатель')
+    created = models.DateTimeField(
+        verbose_name='Дата создания', auto_now_add=True
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name='Попыток отправки', default=0
+    )
+    next_attempt_at = models.DateTimeField(
+        verbose_name='Следующая попытка', default=timezone.now
+    )
+    sent_at = models.DateTimeField(
+        verbose_name='Дата отправки', blank=True, null=True
+    )
+    last_error = models.TextField(verbose_name='Последняя ошибка', blank=True)
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ('next_attempt_at', 'id')
+        indexes = (
+            models.Index(
+                fields=('sent_at', 'next_attempt_at'),
+                name='outgoing_email_due',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
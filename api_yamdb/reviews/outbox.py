@@ -0,0 +1,134 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+
+def enqueue_email(subject, message, recipient_list, from_email=None):
+    """Кладёт письмо в очередь вместо ``send_mail``.
+
+    Вызывается в той же транзакции, что и изменения, ради которых
+    письмо отправляется: при откате письма тоже не будет.
+    """
+    return OutgoingEmail.objects.bulk_create(
+        OutgoingEmail(
+            subject=subject,
+            body=message,
+            from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+            recipient=recipient,
+        )
+        for recipient in recipient_list
+    )
+
+
+def retry_delay(attempts):
+    """Экспоненциальная задержка перед следующей попыткой."""
+    return timedelta(
+        seconds=settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    )
+
+
+def pending_emails():
+    return OutgoingEmail.objects.filter(
+        sent_at__isnull=True,
+        next_attempt_at__lte=timezone.now(),
+        attempts__lt=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+    )
+
+
+def claim_batch(batch_size):
+    """Забирает до ``batch_size`` писем в короткой транзакции.
+
+    Попытка засчитывается сразу, а следующая назначается через
+    EMAIL_OUTBOX_LEASE секунд: если отправитель упадёт, письма снова
+    станут доступны по истечении этого срока.
+    """
+    with transaction.atomic():
+        emails = list(
+            pending_emails().select_for_update(skip_locked=True)
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        if emails:
+            OutgoingEmail.objects.filter(
+                pk__in=[email.pk for email in emails]
+            ).update(
+                attempts=F('attempts') + 1,
+                next_attempt_at=timezone.now() + timedelta(
+                    seconds=settings.EMAIL_OUTBOX_LEASE
+                ),
+            )
+    for email in emails:
+        email.attempts += 1
+    return emails
+
+
+def deliver(emails):
+    """Отправляет письма через одно соединение; вне транзакций, чтобы
+    медленный почтовый сервер не держал блокировку базы."""
+    sent, failed = [], []
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as error:
+        return sent, [(email, error) for email in emails]
+    try:
+        for email in emails:
+            message = EmailMessage(
+                subject=email.subject,
+                body=email.body,
+                from_email=email.from_email or None,
+                to=[email.recipient],
+                connection=connection,
+            )
+            try:
+                message.send()
+            except Exception as error:
+                failed.append((email, error))
+            else:
+                sent.append(email)
+    finally:
+        connection.close()
+    return sent, failed
+
+
+def send_batch(batch_size):
+    """Отправляет до ``batch_size`` писем, у которых подошёл срок,
+    через одно соединение с почтовым сервером.
+
+    Возвращает пару (отправлено, не отправлено). Неудачные письма
+    откладываются с растущей задержкой, пока не исчерпаны попытки.
+    """
+    emails = claim_batch(batch_size)
+    if not emails:
+        return 0, 0
+    sent, failed = deliver(emails)
+
+    now = timezone.now()
+    for email, error in failed:
+        email.next_attempt_at = now + retry_delay(email.attempts)
+        email.last_error = repr(error)
+    with transaction.atomic():
+        OutgoingEmail.objects.filter(
+            pk__in=[email.pk for email in sent]
+        ).update(sent_at=now, last_error='')
+        OutgoingEmail.objects.bulk_update(
+            [email for email, _ in failed],
+            ['next_attempt_at', 'last_error'],
+        )
+    return len(sent), len(failed)
+
+
+def drain(batch_size):
+    """Отправляет пачками все письма, у которых подошёл срок."""
+    total_sent = total_failed = 0
+    while True:
+        sent, failed = send_batch(batch_size)
+        total_sent += sent
+        total_failed += failed
+        if sent + failed < batch_size or not sent:
+            return total_sent, total_failed
@@ -0,0 +1,123 @@
+from itertools import islice
+
+from django.conf import settings
+from django.db.models import Case, Count, F, Q, Sum, When
+
+from .models import SCORE_COUNT_FIELDS, SCORES, Review, Title, TopTitle
+
+
+def apply_score_change(title_id, old_score=None, new_score=None):
+    """Сдвигает агрегаты рейтинга и гистограмму оценок одним UPDATE.
+
+    ``old_score=None`` означает создание отзыва, ``new_score=None`` —
+    удаление. Вызывается сигналами ``Review`` в транзакции записи
+    отзыва.
+    """
+    score_delta = (new_score or 0) - (old_score or 0)
+    count_delta = (new_score is not None) - (old_score is not None)
+    if not score_delta and not count_delta:
+        return
+    new_sum = F('rating_sum') + score_delta
+    new_count = F('rating_count') + count_delta
+    histogram = {}
+    if old_score is not None:
+        field = SCORE_COUNT_FIELDS[old_score - 1]
+        histogram[field] = F(field) - 1
+    if new_score is not None:
+        field = SCORE_COUNT_FIELDS[new_score - 1]
+        histogram[field] = F(field) + 1
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=new_sum,
+        rating_count=new_count,
+        rating=Case(
+            When(rating_count=-count_delta, then=None),
+            default=new_sum / new_count,
+        ),
+        **histogram,
+    )
+    refresh_top_title(title_id, create=count_delta >= 0)
+
+
+def refresh_top_title(title_id, create=True):
+    """Обновляет место произведения в рейтинге по его агрегатам.
+
+    При ``create=False`` (удаление отзыва) новое место не заводится:
+    отзывы удаляются и каскадом вместе с произведением, и созданная
+    в этот момент строка рейтинга ссылалась бы на удаляемое произведение.
+    """
+    totals = Title.objects.filter(pk=title_id).values_list(
+        'rating_sum', 'rating_count'
+    ).first()
+    if totals is None or totals[1] < settings.LEADERBOARD_MIN_REVIEWS:
+        TopTitle.objects.filter(title_id=title_id).delete()
+        return
+    rating_sum, rating_count = totals
+    defaults = {
+        'score': rating_sum / rating_count,
+        'review_count': rating_count,
+    }
+    if create:
+        TopTitle.objects.update_or_create(title_id=title_id, defaults=defaults)
+    else:
+        TopTitle.objects.filter(title_id=title_id).update(**defaults)
+
+
+def rebuild_ratings(title_ids):
+    """Пересчитывает агрегаты рейтинга и гистограмму оценок
+    для переданных произведений."""
+    histogram = {
+        field: Count('id', filter=Q(score=score))
+        for score, field in zip(SCORES, SCORE_COUNT_FIELDS)
+    }
+    totals = {
+        row['title']: row
+        for row in Review.objects.filter(title__in=title_ids)
+        .order_by()
+        .values('title')
+        .annotate(
+            score_sum=Sum('score'), score_count=Count('id'), **histogram
+        )
+    }
+    titles = list(Title.objects.filter(pk__in=title_ids).only('id'))
+    for title in titles:
+        row = totals.get(title.pk)
+        title.rating_sum = row['score_sum'] if row else 0
+        title.rating_count = row['score_count'] if row else 0
+        title.rating = (
+            title.rating_sum // title.rating_count
+            if title.rating_count else None
+        )
+        for field in SCORE_COUNT_FIELDS:
+            setattr(title, field, row[field] if row else 0)
+    Title.objects.bulk_update(
+        titles,
+        ('rating_sum', 'rating_count', 'rating') + SCORE_COUNT_FIELDS,
+    )
+    return len(titles)
+
+
+def rebuild_top_titles(batch_size):
+    """Заново заполняет таблицу рейтинга по агрегатам произведений."""
+    TopTitle.objects.all().delete()
+    titles = (
+        Title.objects.filter(
+            rating_count__gte=settings.LEADERBOARD_MIN_REVIEWS
+        )
+        .order_by()
+        .values_list('pk', 'rating_sum', 'rating_count')
+        .iterator(chunk_size=batch_size)
+    )
+    total = 0
+    while True:
+        batch = [
+            TopTitle(
+                title_id=pk,
+                score=rating_sum / rating_count,
+                review_count=rating_count,
+            )
+            for pk, rating_sum, rating_count in islice(titles, batch_size)
+        ]
+        if not batch:
+            return total
+        TopTitle.objects.bulk_create(batch)
+        total += len(batch)
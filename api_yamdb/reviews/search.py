@@ -0,0 +1,160 @@
+import re
+
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.db.models import (Case, F, FloatField, IntegerField, Q, Value,
+                              When)
+from django.db.models.expressions import Expression, RawSQL
+
+FTS_TABLE = 'reviews_title_fts'
+TOKEN_REGEX = re.compile(r'\w+')
+
+_fts_enabled = {}
+
+
+def fts_enabled(using=DEFAULT_DB_ALIAS):
+    """Есть ли в базе FTS5-индекс произведений (только SQLite)."""
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return False
+    if using not in _fts_enabled:
+        with connection.cursor() as cursor:
+            _fts_enabled[using] = (
+                FTS_TABLE in connection.introspection.table_names(cursor)
+            )
+    return _fts_enabled[using]
+
+
+def create_index(connection):
+    """Создаёт FTS5-таблицу, если SQLite собран с поддержкой FTS5."""
+    if connection.vendor != 'sqlite':
+        return
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} '
+                f'USING fts5(name, description)'
+            )
+    except OperationalError:
+        return
+    _fts_enabled.pop(connection.alias, None)
+
+
+def drop_index(connection):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+    _fts_enabled.pop(connection.alias, None)
+
+
+def index_titles(rows, using=DEFAULT_DB_ALIAS):
+    """Записывает в индекс строки ``(id, name, description)``."""
+    if not fts_enabled(using):
+        return
+    rows = list(rows)
+    with connections[using].cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+            [(row[0],) for row in rows],
+        )
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, name, description) '
+            f'VALUES (%s, %s, %s)',
+            [(pk, name, description or '') for pk, name, description in rows],
+        )
+
+
+def unindex_title(title_id, using=DEFAULT_DB_ALIAS):
+    if not fts_enabled(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [title_id]
+        )
+
+
+def clear_index(using=DEFAULT_DB_ALIAS):
+    if not fts_enabled(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+
+
+def build_match(query):
+    """Превращает ввод пользователя в безопасный FTS5-запрос по префиксам."""
+    return ' '.join(f'"{token}"*' for token in TOKEN_REGEX.findall(query))
+
+
+class MatchingRowids(RawSQL):
+    """Подзапрос rowid, подходящих под FTS5-запрос, для ``pk__in``.
+
+    В отличие от RawSQL не добавляет своих скобок: SQLite считает
+    ``IN ((SELECT ...))`` скалярным подзапросом.
+    """
+
+    def __init__(self, match):
+        super().__init__(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+            [match],
+        )
+
+    def as_sql(self, compiler, connection):
+        return self.sql, self.params
+
+
+class Bm25Rank(Expression):
+    """Оценка bm25 произведения по FTS5-запросу (меньше — лучше).
+
+    Столбец id подставляет компилятор, поэтому выражение остаётся
+    верным, когда запрос становится подзапросом с другим псевдонимом.
+    """
+
+    output_field = FloatField()
+
+    def __init__(self, match, pk=None):
+        super().__init__()
+        self.match = match
+        self.pk = pk if pk is not None else F('pk')
+
+    def get_source_expressions(self):
+        return [self.pk]
+
+    def set_source_expressions(self, exprs):
+        self.pk, = exprs
+
+    def as_sql(self, compiler, connection):
+        pk_sql, pk_params = compiler.compile(self.pk)
+        return (
+            f'(SELECT bm25({FTS_TABLE}) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.rowid = {pk_sql})',
+            [self.match, *pk_params],
+        )
+
+
+def search_titles(queryset, query):
+    """Фильтрует произведения по запросу и сортирует по релевантности.
+
+    На SQLite с FTS5 используется ранжирование bm25, на других базах —
+    ``icontains`` по названию и описанию, совпадения в названии выше.
+    """
+    tokens = TOKEN_REGEX.findall(query)
+    if not tokens:
+        return queryset.none()
+    if fts_enabled(queryset.db):
+        match = build_match(query)
+        return queryset.filter(pk__in=MatchingRowids(match)).annotate(
+            search_rank=Bm25Rank(match)
+        ).order_by('search_rank', 'id')
+
+    in_name = Q()
+    in_text = Q()
+    for token in tokens:
+        in_name &= Q(name__icontains=token)
+        in_text &= Q(name__icontains=token) | Q(description__icontains=token)
+    return queryset.filter(in_text).annotate(
+        search_rank=Case(
+            When(in_name, then=Value(0)),
+            default=Value(1),
+            output_field=IntegerField(),
+        )
+    ).order_by('search_rank', 'id')
@@ -0,0 +1,67 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from .bloom import user_filter
+from .models import Review, Title, User
+from .ratings import apply_score_change
+from .search import index_titles, unindex_title
+
+# Массовые изменения произведений в обход save()/delete():
+# bulk_create, пересчёт рейтингов и индексов.
+titles_changed = Signal()
+# Загрузка данных из CSV: tables — имена загруженных файлов.
+data_loaded = Signal()
+
+
+@receiver(post_save, sender=Title)
+def index_title(sender, instance, using, **kwargs):
+    index_titles(
+        [(instance.pk, instance.name, instance.description)], using=using
+    )
+
+
+@receiver(post_delete, sender=Title)
+def remove_title_from_index(sender, instance, using, **kwargs):
+    unindex_title(instance.pk, using=using)
+
+
+@receiver(post_save, sender=User)
+def add_user_to_filter(sender, instance, **kwargs):
+    user_filter.add(instance)
+
+
+@receiver(pre_save, sender=Review)
+def remember_saved_score(sender, instance, using, **kwargs):
+    """Запоминает произведение и оценку отзыва, как они записаны в базе:
+    экземпляр мог быть загружен до параллельной правки."""
+    instance._saved_score = None
+    if instance.pk is None:
+        return
+    reviews = Review.objects.using(using).filter(pk=instance.pk)
+    if not transaction.get_autocommit(using):
+        reviews = reviews.select_for_update()
+    instance._saved_score = reviews.values_list('title_id', 'score').first()
+
+
+@receiver(post_save, sender=Review)
+def add_review_score(sender, instance, update_fields, **kwargs):
+    saved = instance._saved_score
+    instance._saved_score = None
+    if update_fields is not None and not {'title', 'score'} & set(
+        update_fields
+    ):
+        return
+    old_score = None
+    if saved is not None:
+        title_id, old_score = saved
+        if title_id != instance.title_id:
+            apply_score_change(title_id, old_score=old_score)
+            old_score = None
+    apply_score_change(instance.title_id, old_score, instance.score)
+
+
+@receiver(post_delete, sender=Review)
+def remove_review_score(sender, instance, **kwargs):
+    # В том числе каскадное удаление с автором или произведением
+    apply_score_change(instance.title_id, old_score=instance.score)
@@ -0,0 +1,241 @@
+import math
+import random
+from datetime import datetime, timedelta, timezone
+
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+
+from .models import Category, Comment, Genre, Review, Title, User
+
+# Даты отзывов и комментариев: фиксированный период, чтобы при одном
+# зерне данные не зависели от дня генерации
+PERIOD_START = datetime(2018, 1, 1, tzinfo=timezone.utc)
+PERIOD_SECONDS = 3 * 365 * 24 * 3600
+WORDS = (
+    'сюжет', 'герой', 'финал', 'музыка', 'автор', 'стиль', 'идея', 'темп',
+    'образ', 'диалоги', 'атмосфера', 'перевод', 'ритм', 'мир', 'конфликт',
+    'отлично', 'скучно', 'неожиданно', 'сильно', 'слабо', 'красиво',
+    'затянуто', 'живо', 'честно', 'глубоко', 'наивно', 'смешно', 'грустно',
+)
+# Слов в заготовке, из отрезков которой собираются тексты
+CORPUS_SIZE = 4096
+# Сколько случайных значений берётся за раз, чтобы не держать
+# в памяти выбор для всех строк сразу
+DRAW_CHUNK = 10000
+
+
+class Zipf:
+    """Случайные элементы ``items`` (``range``): элемент ранга r
+    выпадает с вероятностью примерно 1 / r ** skew.
+
+    Ранг берётся обратной функцией непрерывного приближения
+    распределения, а ранги раздаются элементам случайной
+    перестановкой ``r * a + b mod n``, так что память не зависит
+    от числа элементов.
+    """
+
+    def __init__(self, items, skew, rng):
+        self.items = items
+        self.skew = skew
+        self.rng = rng
+        size = len(items)
+        self.multiplier = 1
+        while size > 1:
+            self.multiplier = rng.randrange(1, size)
+            if math.gcd(self.multiplier, size) == 1:
+                break
+        self.offset = rng.randrange(size) if size else 0
+        if skew != 1:
+            self.span = (size + 1) ** (1 - skew) - 1
+
+    def rank(self):
+        uniform = self.rng.random()
+        if self.skew == 1:
+            value = (len(self.items) + 1) ** uniform
+        else:
+            value = (1 + uniform * self.span) ** (1 / (1 - self.skew))
+        return min(int(value), len(self.items)) - 1
+
+    def sample(self, count):
+        size = len(self.items)
+        return [
+            self.items[(self.rank() * self.multiplier + self.offset) % size]
+            for _ in range(count)
+        ]
+
+    def distinct(self, count):
+        """``count`` разных элементов; если их нужно много, популярность
+        перестаёт играть роль и выбор делается равномерно."""
+        if count * 4 > len(self.items):
+            return self.rng.sample(self.items, count)
+        chosen = set()
+        while len(chosen) < count:
+            chosen.update(self.sample(count - len(chosen)))
+        return chosen
+
+
+class SyntheticData:
+    """Детерминированный набор данных заданного размера.
+
+    Каждая таблица строится своим генератором случайных чисел,
+    зависящим только от зерна, поэтому одинаковые параметры дают
+    одинаковые строки. Отзывы распределены по произведениям по закону
+    Ципфа, авторы отзывов и комментариев тоже: немногие пользователи
+    пишут очень много. Первичные ключи идут подряд от ``start_ids``.
+
+    Метод с именем таблицы отдаёт кортежи значений полей ``FIELDS``.
+    """
+
+    FIELDS = {
+        'users': (
+            User, ('id', 'username', 'email', 'password', 'role', 'bio'),
+        ),
+        'category': (Category, ('id', 'name', 'slug')),
+        'genre': (Genre, ('id', 'name', 'slug')),
+        'titles': (
+            Title, ('id', 'name', 'description', 'year', 'category_id'),
+        ),
+        'genre_title': (Title.genre.through, ('id', 'title_id', 'genre_id')),
+        'review': (
+            Review,
+            ('id', 'title_id', 'author_id', 'score', 'text', 'pub_date'),
+        ),
+        'comments': (
+            Comment, ('id', 'review_id', 'author_id', 'text', 'pub_date'),
+        ),
+    }
+
+    def __init__(self, seed, users, categories, genres, titles, reviews,
+                 comments, skew=1.1, start_ids=None):
+        self.seed = seed
+        self.sizes = {
+            'users': users,
+            'category': categories,
+            'genre': genres,
+            'titles': titles,
+            'review': reviews,
+            'comments': comments,
+        }
+        self.skew = skew
+        self.start_ids = start_ids or {}
+        self._review_counts = None
+        self.corpus = self.rng('corpus').choices(WORDS, k=CORPUS_SIZE)
+
+    def rng(self, name):
+        return random.Random(f'{self.seed}:{name}')
+
+    def ids(self, name):
+        start = self.start_ids.get(name, 1)
+        return range(start, start + self.sizes[name])
+
+    def date(self, rng):
+        return PERIOD_START + timedelta(seconds=rng.randrange(PERIOD_SECONDS))
+
+    def text(self, rng, low, high):
+        start = rng.randrange(CORPUS_SIZE - high)
+        return ' '.join(self.corpus[start:start + rng.randint(low, high)])
+
+    def users(self):
+        rng = self.rng('users')
+        password = f'{UNUSABLE_PASSWORD_PREFIX}synthetic'
+        for pk in self.ids('users'):
+            yield (
+                pk,
+                f'synthetic{pk}',
+                f'synthetic{pk}@example.com',
+                password,
+                'moderator' if rng.random() < 0.01 else 'user',
+                self.text(rng, 0, 12),
+            )
+
+    def category(self):
+        for pk in self.ids('category'):
+            yield pk, f'Категория {pk}', f'category-{pk}'
+
+    def genre(self):
+        for pk in self.ids('genre'):
+            yield pk, f'Жанр {pk}', f'genre-{pk}'
+
+    def titles(self):
+        rng = self.rng('titles')
+        categories = Zipf(self.ids('category'), self.skew, rng)
+        for pk in self.ids('titles'):
+            yield (
+                pk,
+                f'Произведение {pk}',
+                self.text(rng, 5, 40),
+                rng.randint(1900, PERIOD_START.year),
+                categories.sample(1)[0] if categories.items else None,
+            )
+
+    def genre_title(self):
+        rng = self.rng('genre_title')
+        genres = Zipf(self.ids('genre'), self.skew, rng)
+        pk = self.start_ids.get('genre_title', 1)
+        if not genres.items:
+            return
+        for title_id in self.ids('titles'):
+            count = min(rng.randint(1, 3), len(genres.items))
+            for genre_id in sorted(genres.distinct(count)):
+                yield pk, title_id, genre_id
+                pk += 1
+
+    def review_counts(self):
+        """Количество отзывов у каждого произведения; у произведения
+        не больше отзывов, чем пользователей (один отзыв на автора)."""
+        if self._review_counts is None:
+            rng = self.rng('review_counts')
+            titles = Zipf(self.ids('titles'), self.skew, rng)
+            start = self.start_ids.get('titles', 1)
+            counts = [0] * self.sizes['titles']
+            left = self.sizes['review'] if titles.items else 0
+            while left:
+                for title_id in titles.sample(min(left, DRAW_CHUNK)):
+                    counts[title_id - start] += 1
+                left -= min(left, DRAW_CHUNK)
+            limit = self.sizes['users']
+            self._review_counts = [min(count, limit) for count in counts]
+        return self._review_counts
+
+    def review_total(self):
+        return sum(self.review_counts())
+
+    def review(self):
+        rng = self.rng('review')
+        authors = Zipf(self.ids('users'), self.skew, rng)
+        pk = self.start_ids.get('review', 1)
+        for title_id, count in zip(self.ids('titles'), self.review_counts()):
+            quality = rng.uniform(2, 9)
+            for author_id in sorted(authors.distinct(count)):
+                score = round(rng.gauss(quality, 1.5))
+                yield (
+                    pk,
+                    title_id,
+                    author_id,
+                    min(max(score, 1), 10),
+                    self.text(rng, 3, 60),
+                    self.date(rng),
+                )
+                pk += 1
+
+    def comments(self):
+        rng = self.rng('comments')
+        start = self.start_ids.get('review', 1)
+        reviews = Zipf(
+            range(start, start + self.review_total()), self.skew, rng
+        )
+        authors = Zipf(self.ids('users'), self.skew, rng)
+        pks = iter(self.ids('comments'))
+        left = self.sizes['comments'] if reviews.items else 0
+        while left:
+            count = min(left, DRAW_CHUNK)
+            for review_id, author_id in zip(
+                reviews.sample(count), authors.sample(count)
+            ):
+                yield (
+                    next(pks),
+                    review_id,
+                    author_id,
+                    self.text(rng, 2, 30),
+                    self.date(rng),
+                )
+            left -= count
@@ -0,0 +1,24 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(settings):
+    from django.core.cache import cache
+    from api.cache import reset_stats
+    settings.CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }}
+    cache.clear()
+    reset_stats()
+
+
+@pytest.fixture(autouse=True)
+def reset_user_filter():
+    from reviews.bloom import user_filter
+    user_filter.reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_throttles():
+    from api.throttling import get_store
+    get_store().clear()
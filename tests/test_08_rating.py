@@ -0,0 +1,134 @@
+import pytest
+from django.core.management import call_command
+from django.test import Client
+
+from api.serializers import ReviewSerializer
+from api.views import ReviewViewSet
+from reviews.models import Review, Title, TopTitle, User
+
+from .common import auth_client, create_reviews
+
+
+class Test08RatingAggregates:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_rating_follows_reviews(self, admin_client, admin):
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count, title.rating) == (12, 3, 4), (
+            'Проверьте, что при создании отзыва обновляются агрегаты рейтинга произведения'
+        )
+
+        admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/',
+            data={'score': 10}
+        )
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count, title.rating) == (17, 3, 5), (
+            'Проверьте, что при изменении оценки обновляются агрегаты рейтинга произведения'
+        )
+
+        for review in reviews:
+            admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/reviews/{review["id"]}/')
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count, title.rating) == (0, 0, None), (
+            'Проверьте, что при удалении всех отзывов рейтинг произведения сбрасывается'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_rebuild_ratings_command(self, admin_client, admin):
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        Title.objects.update(rating_sum=0, rating_count=0, rating=None)
+        call_command('rebuild_ratings', chunk_size=1)
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count, title.rating) == (12, 3, 4), (
+            'Проверьте, что команда `rebuild_ratings` пересчитывает рейтинг по отзывам'
+        )
+        title = Title.objects.get(pk=titles[1]['id'])
+        assert title.rating is None, (
+            'Проверьте, что команда `rebuild_ratings` оставляет рейтинг пустым для произведений без отзывов'
+        )
+        response = auth_client(user).get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json().get('rating') == 4
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_double_delete_counts_once(self, admin_client, admin):
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        first = Review.objects.get(pk=reviews[0]['id'])
+        second = Review.objects.get(pk=reviews[0]['id'])
+        # Два параллельных DELETE одного отзыва
+        ReviewViewSet().perform_destroy(first)
+        ReviewViewSet().perform_destroy(second)
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count) == (12 - first.score, 2), (
+            'Проверьте, что повторное удаление отзыва не вычитает оценку дважды'
+        )
+        assert sum(title.histogram.values()) == 2
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_update_uses_current_score(self, admin_client, admin):
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        stale = Review.objects.get(pk=reviews[0]['id'])
+        # Параллельная правка уже поменяла оценку
+        admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{stale.pk}/', data={'score': 10}
+        )
+        serializer = ReviewSerializer(stale, data={'score': 1}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        ReviewViewSet().perform_update(serializer)
+        title = Title.objects.get(pk=titles[0]['id'])
+        expected = sum(Review.objects.filter(title=title).values_list('score', flat=True))
+        assert title.rating_sum == expected, (
+            'Проверьте, что при изменении оценки вычитается её текущее значение'
+        )
+        assert title.histogram[10] == 0 and title.histogram[1] == 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_cascade_delete(self, admin_client, admin):
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        assert TopTitle.objects.filter(title_id=titles[0]['id']).exists()
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == 204
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count) == (9, 2), (
+            'Проверьте, что удаление автора вместе с отзывами обновляет '
+            'рейтинг произведения'
+        )
+        assert title.histogram[3] == 0 and sum(title.histogram.values()) == 2
+        assert not TopTitle.objects.filter(title_id=title.pk).exists()
+
+        auth_client(User.objects.create(username='third', email='third@ya.ru')).post(
+            f'/api/v1/titles/{title.pk}/reviews/', data={'text': 'x', 'score': 7}
+        )
+        assert TopTitle.objects.filter(title_id=title.pk).exists()
+        admin_client.delete(f'/api/v1/titles/{title.pk}/')
+        assert not Title.objects.filter(pk=title.pk).exists(), (
+            'Проверьте, что произведение из рейтинга удаляется вместе с отзывами'
+        )
+        assert not TopTitle.objects.exists()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_admin_edits(self, admin_client, admin, user_superuser):
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        client = Client()
+        client.force_login(user_superuser)
+        review = Review.objects.get(pk=reviews[0]['id'])
+        response = client.post(f'/admin/reviews/review/{review.pk}/change/', data={
+            'title': titles[1]['id'], 'author': review.author_id,
+            'text': review.text, 'score': 9,
+        })
+        assert response.status_code == 302
+        first = Title.objects.get(pk=titles[0]['id'])
+        second = Title.objects.get(pk=titles[1]['id'])
+        assert (first.rating_sum, first.rating_count) == (7, 2), (
+            'Проверьте, что правка отзыва в админке обновляет рейтинг '
+            'прежнего произведения'
+        )
+        assert (second.rating_sum, second.rating_count, second.histogram[9]) == (9, 1, 1)
+
+        client.post('/admin/reviews/review/', data={
+            'action': 'delete_selected', 'post': 'yes',
+            '_selected_action': [reviews[1]['id'], reviews[2]['id']],
+        })
+        first.refresh_from_db()
+        assert (first.rating_sum, first.rating_count, first.rating) == (0, 0, None)
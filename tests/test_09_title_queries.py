@@ -0,0 +1,41 @@
+import pytest
+
+from reviews.models import Category, Genre, Title
+
+
+def create_catalog(size):
+    category = Category.objects.create(name='Фильм', slug='films')
+    genres = [
+        Genre.objects.create(name='Ужасы', slug='horror'),
+        Genre.objects.create(name='Комедия', slug='comedy'),
+    ]
+    for number in range(size):
+        title = Title.objects.create(
+            name=f'Произведение {number}', year=2000, category=category
+        )
+        title.genre.set(genres)
+
+
+class Test09TitleQueries:
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('limit', [1, 10, 30])
+    def test_01_title_list_query_budget(self, client, django_assert_num_queries, limit):
+        create_catalog(30)
+        # COUNT для пагинации, страница произведений с категориями, жанры страницы
+        with django_assert_num_queries(3):
+            response = client.get(f'/api/v1/titles/?limit={limit}')
+        assert response.status_code == 200
+        assert len(response.json()['results']) == limit, (
+            'Проверьте, что при GET запросе `/api/v1/titles/` возвращается страница нужного размера'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_title_detail_query_budget(self, client, django_assert_num_queries):
+        create_catalog(1)
+        title = Title.objects.get()
+        with django_assert_num_queries(2):
+            response = client.get(f'/api/v1/titles/{title.id}/')
+        assert response.status_code == 200
+        assert len(response.json()['genre']) == 2
+        assert response.json()['category']['slug'] == 'films'
@@ -0,0 +1,88 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Comment, Review, Title
+
+from .common import create_comments
+
+
+def walk(client, url):
+    pages = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что в режиме курсора ответ не содержит `count`'
+        )
+        pages.append(data)
+        url = data['next']
+    return pages
+
+
+class Test10CursorPagination:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_cursor(self, client):
+        films = Category.objects.create(name='Фильм', slug='films')
+        books = Category.objects.create(name='Книги', slug='books')
+        for number in range(7):
+            Title.objects.create(
+                name=f'Произведение {number}', year=2000,
+                category=(films, books, None)[number % 3]
+            )
+        expected = [
+            title.id for title in
+            Title.objects.order_by('category_id', 'name', 'id')
+        ]
+
+        with CaptureQueriesContext(connection) as context:
+            client.get('/api/v1/titles/?pagination=cursor&limit=3')
+        assert not any('COUNT(' in query['sql'] for query in context.captured_queries), (
+            'Проверьте, что в режиме курсора не выполняется `COUNT(*)`'
+        )
+
+        pages = walk(client, '/api/v1/titles/?pagination=cursor&limit=3')
+        assert [len(page['results']) for page in pages] == [3, 3, 1]
+        assert [item['id'] for page in pages for item in page['results']] == expected, (
+            'Проверьте, что курсорная пагинация `/api/v1/titles/` '
+            'возвращает все произведения в порядке сортировки без повторов'
+        )
+        assert pages[0]['previous'] is None
+
+        backward = client.get(pages[-1]['previous']).json()
+        assert [item['id'] for item in backward['results']] == expected[3:6], (
+            'Проверьте, что ссылка `previous` возвращает предыдущую страницу'
+        )
+        assert backward['next'] and backward['previous']
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_reviews_and_comments_cursor(self, client, admin_client, admin):
+        comments, reviews, titles, user, moderator = create_comments(admin_client, admin)
+        title_id = titles[0]['id']
+        Review.objects.update(score=5)
+
+        url = f'/api/v1/titles/{title_id}/reviews/?pagination=cursor&limit=2'
+        pages = walk(client, url)
+        expected = list(
+            Review.objects.filter(title_id=title_id)
+            .order_by('score', 'pub_date', 'id').values_list('id', flat=True)
+        )
+        assert [item['id'] for page in pages for item in page['results']] == expected, (
+            'Проверьте, что курсорная пагинация отзывов корректно обрабатывает равные оценки'
+        )
+
+        review_id = reviews[0]['id']
+        url = f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/?pagination=cursor&limit=1'
+        pages = walk(client, url)
+        expected = list(
+            Comment.objects.filter(review_id=review_id)
+            .order_by('pub_date', 'id').values_list('id', flat=True)
+        )
+        assert [item['id'] for page in pages for item in page['results']] == expected
+
+        response = client.get(f'/api/v1/titles/{title_id}/reviews/?cursor=broken')
+        assert response.status_code == 404, (
+            'Проверьте, что при некорректном курсоре возвращается статус 404'
+        )
@@ -0,0 +1,69 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from reviews.models import Title
+from reviews.search import FTS_TABLE, fts_enabled
+
+from .common import create_titles
+
+
+def search(client, query):
+    response = client.get('/api/v1/titles/', {'search': query})
+    assert response.status_code == 200
+    return [title['id'] for title in response.json()['results']]
+
+
+class Test11TitleSearch:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_search_ranked(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        drama = Title.objects.create(
+            name='Драма драма драма', year=1999, description='Драма'
+        )
+        assert search(client, 'драм') == [drama.id, titles[1]['id']], (
+            'Проверьте, что `?search=` находит произведения по началу слова '
+            'в названии и описании и сортирует их по релевантности'
+        )
+        assert search(client, 'крутое пике') == [titles[0]['id']]
+        assert search(client, 'ничего') == []
+        assert search(client, '"*(') == []
+
+        admin_client.patch(f'/api/v1/titles/{titles[0]["id"]}/', data={'description': 'Комедия'})
+        assert search(client, 'крутое') == [], (
+            'Проверьте, что индекс обновляется при изменении произведения'
+        )
+        admin_client.delete(f'/api/v1/titles/{titles[1]["id"]}/')
+        assert search(client, 'драм') == [drama.id], (
+            'Проверьте, что индекс обновляется при удалении произведения'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_rebuild_search_index(self, client, admin_client):
+        if not fts_enabled():
+            pytest.skip('SQLite собран без FTS5')
+        titles, _, _ = create_titles(admin_client)
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        assert search(client, 'проект') == []
+        call_command('rebuild_search_index', batch_size=1)
+        assert search(client, 'проект') == [titles[1]['id']], (
+            'Проверьте, что команда `rebuild_search_index` заполняет индекс'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_search_rejects_cursor(self, client, admin_client):
+        create_titles(admin_client)
+        response = client.get(
+            '/api/v1/titles/', {'search': 'драм', 'pagination': 'cursor'}
+        )
+        assert response.status_code == 400, (
+            'Проверьте, что поиск не листается курсором: курсор потерял бы '
+            'сортировку по релевантности'
+        )
+        assert 'pagination' in response.json()
+        response = client.get(
+            '/api/v1/titles/', {'search': '', 'pagination': 'cursor'}
+        )
+        assert response.status_code == 200
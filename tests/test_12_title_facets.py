@@ -0,0 +1,51 @@
+import pytest
+from django.core.cache import cache
+
+from .common import create_titles
+
+
+def counts(data, facet, key='slug'):
+    return {item[key]: item['count'] for item in data[facet]}
+
+
+class Test12TitleFacets:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_facets(self, client, admin_client, django_assert_max_num_queries):
+        cache.clear()
+        titles, categories, genres = create_titles(admin_client)
+        with django_assert_max_num_queries(3):
+            response = client.get('/api/v1/titles/facets/')
+        assert response.status_code == 200, (
+            'Проверьте, что при GET запросе `/api/v1/titles/facets/` возвращается статус 200'
+        )
+        data = response.json()
+        assert counts(data, 'genre') == {'horror': 1, 'comedy': 1, 'drama': 1}
+        assert counts(data, 'category') == {'films': 1, 'books': 1}
+        assert counts(data, 'year', 'year') == {2000: 1, 2020: 1}
+
+        data = client.get('/api/v1/titles/facets/?genre=comedy').json()
+        assert counts(data, 'genre') == {'horror': 1, 'comedy': 1, 'drama': 0}, (
+            'Проверьте, что `/api/v1/titles/facets/` учитывает параметры фильтрации'
+        )
+        assert counts(data, 'category') == {'films': 1, 'books': 0}
+        assert counts(data, 'year', 'year') == {2000: 1}
+
+        with django_assert_max_num_queries(0):
+            cached = client.get('/api/v1/titles/facets/?genre=comedy').json()
+        assert cached == data, (
+            'Проверьте, что ответ `/api/v1/titles/facets/` кешируется для одинаковых параметров'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_facets_with_search(self, client, admin_client):
+        cache.clear()
+        create_titles(admin_client)
+        response = client.get('/api/v1/titles/facets/?search=драма')
+        assert response.status_code == 200, (
+            'Проверьте, что `/api/v1/titles/facets/` принимает параметр `search`'
+        )
+        data = response.json()
+        assert counts(data, 'genre') == {'horror': 0, 'comedy': 0, 'drama': 1}
+        assert counts(data, 'category') == {'films': 0, 'books': 1}
+        assert counts(data, 'year', 'year') == {2020: 1}
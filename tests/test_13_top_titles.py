@@ -0,0 +1,50 @@
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Review, Title, TopTitle
+
+from .common import auth_client, create_reviews
+
+
+class Test13TopTitles:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_top_titles(self, client, admin_client, admin):
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        admin_client.post(f'/api/v1/titles/{titles[1]["id"]}/reviews/', data={'text': 'Шедевр', 'score': 10})
+
+        response = client.get('/api/v1/titles/top/')
+        assert response.status_code == 200, (
+            'Проверьте, что при GET запросе `/api/v1/titles/top/` возвращается статус 200'
+        )
+        data = response.json()
+        assert [title['id'] for title in data['results']] == [titles[0]['id']], (
+            'Проверьте, что в рейтинг не попадают произведения '
+            'с количеством отзывов меньше LEADERBOARD_MIN_REVIEWS'
+        )
+        assert data['results'][0]['rating'] == 4
+
+        assert client.get('/api/v1/titles/top/?category=films').json()['count'] == 1
+        assert client.get('/api/v1/titles/top/?category=books').json()['count'] == 0
+        assert client.get('/api/v1/titles/top/?genre=comedy').json()['count'] == 1
+        assert client.get('/api/v1/titles/top/?genre=drama').json()['count'] == 0
+        assert client.get('/api/v1/titles/top/?min_reviews=4').json()['count'] == 0
+
+        auth_client(user).delete(f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[1]["id"]}/')
+        assert not TopTitle.objects.exists(), (
+            'Проверьте, что произведение убирается из рейтинга, '
+            'когда отзывов становится меньше минимума'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_rebuild_top_titles(self, admin_client, admin, settings):
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        settings.LEADERBOARD_MIN_REVIEWS = 1
+        Review.objects.filter(pk=reviews[0]['id']).update(title_id=titles[1]['id'])
+        call_command('rebuild_ratings')
+        call_command('rebuild_top_titles', batch_size=1)
+        top = list(TopTitle.objects.values_list('title_id', 'score', 'review_count'))
+        assert top == [(titles[1]['id'], 5.0, 1), (titles[0]['id'], 3.5, 2)], (
+            'Проверьте, что команда `rebuild_top_titles` пересчитывает рейтинг'
+        )
+        assert Title.objects.get(pk=titles[0]['id']).top.review_count == 2
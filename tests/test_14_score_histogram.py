@@ -0,0 +1,45 @@
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Title
+
+from .common import create_reviews
+
+
+def expected_histogram(**counts):
+    return {str(score): counts.get(f's{score}', 0) for score in range(1, 11)}
+
+
+class Test14ScoreHistogram:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_histogram(self, client, admin_client, admin, django_assert_num_queries):
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+
+        with django_assert_num_queries(2):
+            data = client.get(title_url).json()
+        assert data.get('histogram') == expected_histogram(s3=1, s4=1, s5=1), (
+            'Проверьте, что при GET запросе `/api/v1/titles/{title_id}/` '
+            'возвращается гистограмма оценок `histogram`'
+        )
+
+        admin_client.patch(f'{title_url}reviews/{reviews[0]["id"]}/', data={'score': 3})
+        admin_client.delete(f'{title_url}reviews/{reviews[2]["id"]}/')
+        data = client.get(title_url).json()
+        assert data['histogram'] == expected_histogram(s3=2), (
+            'Проверьте, что гистограмма обновляется при изменении и удалении отзывов'
+        )
+
+        results = client.get('/api/v1/titles/').json()['results']
+        assert all('histogram' not in title for title in results), (
+            'Проверьте, что список произведений не содержит гистограмму без `?fields=histogram`'
+        )
+        results = client.get('/api/v1/titles/?fields=histogram').json()['results']
+        assert all('histogram' in title for title in results)
+
+        Title.objects.update(score_3_count=0)
+        call_command('rebuild_ratings')
+        assert client.get(title_url).json()['histogram'] == expected_histogram(s3=2), (
+            'Проверьте, что команда `rebuild_ratings` пересчитывает гистограмму'
+        )
@@ -0,0 +1,67 @@
+import pytest
+
+from reviews.models import Title
+
+from .common import create_categories, create_genre
+
+
+class Test15TitleBulkCreate:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_bulk_create(self, client, admin_client, django_assert_max_num_queries):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        existing = admin_client.post('/api/v1/titles/', data={
+            'name': 'Старое', 'year': 1990, 'genre': [genres[0]['slug']],
+            'category': categories[0]['slug']
+        }, format='json').json()
+        payload = [
+            {'name': f'Произведение {number}', 'year': 1950 + number,
+             'genre': [genres[number % 3]['slug'], genres[0]['slug']],
+             'category': categories[number % 2]['slug'], 'description': 'Массовая загрузка'}
+            for number in range(50)
+        ]
+        # авторизация, категории, жанры, вставка произведений, id, связи, индекс, жанры ответа
+        with django_assert_max_num_queries(12):
+            response = admin_client.post('/api/v1/titles/', data=payload, format='json')
+        assert response.status_code == 201, (
+            'Проверьте, что при POST запросе `/api/v1/titles/` со списком произведений '
+            'возвращается статус 201'
+        )
+        data = response.json()
+        assert len(data) == 50
+        for item, created in zip(payload, data):
+            title = Title.objects.get(pk=created['id'])
+            assert title.name == item['name'] and title.category.slug == item['category']
+            assert sorted(title.genre.values_list('slug', flat=True)) == sorted(set(item['genre']))
+            assert sorted(created['genre']) == sorted(set(item['genre']))
+        assert data[0]['id'] > existing['id']
+
+        found = client.get('/api/v1/titles/', {'search': 'массовая'}).json()
+        assert found['count'] == 50, (
+            'Проверьте, что массово созданные произведения попадают в поисковый индекс'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_bulk_create_errors(self, admin_client, user_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        payload = [
+            {'name': 'Верно', 'year': 2000, 'genre': [genres[0]['slug']], 'category': categories[0]['slug']},
+            {'name': 'Нет жанра', 'year': 2000, 'genre': ['unknown'], 'category': categories[0]['slug']},
+            {'name': 'Из будущего', 'year': 3000, 'genre': [], 'category': 'unknown'},
+        ]
+        response = admin_client.post('/api/v1/titles/', data=payload, format='json')
+        assert response.status_code == 400, (
+            'Проверьте, что при ошибке в одном из произведений возвращается статус 400'
+        )
+        errors = response.json()
+        assert errors[0] == {}
+        assert set(errors[1]) == {'genre'}
+        assert set(errors[2]) == {'year', 'category'}
+        assert not Title.objects.exists(), (
+            'Проверьте, что при ошибке не создаётся ни одно произведение'
+        )
+
+        response = user_client.post('/api/v1/titles/', data=payload[:1], format='json')
+        assert response.status_code == 403
@@ -0,0 +1,87 @@
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+
+from api.cache import STATS_KEYS, get_stats
+
+from .common import create_reviews
+
+
+@pytest.fixture(params=['locmem', 'file'])
+def cache_backend(request, settings, tmp_path):
+    if request.param == 'locmem':
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }}
+    else:
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path),
+        }}
+    return request.param
+
+
+class Test16ResponseCache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_cache_and_invalidation(self, cache_backend, client, admin_client, admin,
+                                       django_assert_num_queries):
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        urls = ['/api/v1/categories/', '/api/v1/genres/', '/api/v1/titles/?limit=5',
+                title_url, f'{title_url}reviews/', f'{title_url}reviews/{reviews[0]["id"]}/']
+        for url in urls:
+            assert client.get(url)['X-Cache'] == 'MISS'
+        for url in urls:
+            with django_assert_num_queries(0):
+                response = client.get(url)
+            assert response['X-Cache'] == 'HIT', (
+                f'Проверьте, что повторный GET запрос `{url}` обслуживается из кеша'
+            )
+
+        admin_client.post('/api/v1/genres/', data={'name': 'Мюзикл', 'slug': 'musical'})
+        assert client.get('/api/v1/genres/')['X-Cache'] == 'MISS'
+        assert client.get('/api/v1/titles/?limit=5')['X-Cache'] == 'MISS'
+        assert client.get('/api/v1/categories/')['X-Cache'] == 'HIT', (
+            'Проверьте, что изменение жанров не сбрасывает кеш категорий'
+        )
+
+        admin_client.patch(f'{title_url}reviews/{reviews[0]["id"]}/', data={'score': 10})
+        assert client.get(f'{title_url}reviews/{reviews[0]["id"]}/').json()['score'] == 10
+        assert client.get(title_url).json()['rating'] == 5, (
+            'Проверьте, что изменение отзыва сбрасывает кеш произведения'
+        )
+        other_reviews = f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+        client.get(other_reviews)
+        admin_client.delete(f'{title_url}reviews/{reviews[1]["id"]}/')
+        assert client.get(other_reviews)['X-Cache'] == 'HIT', (
+            'Проверьте, что изменение отзыва не сбрасывает кеш отзывов других произведений'
+        )
+        assert len(client.get(f'{title_url}reviews/').json()['results']) == 2
+
+        admin_client.patch(f'/api/v1/titles/{titles[0]["id"]}/', data={'genre': ['drama']})
+        genres = client.get(title_url).json()['genre']
+        assert [genre['slug'] for genre in genres] == ['drama']
+
+        stats = get_stats()
+        assert stats['hits'] >= 7 and stats['misses'] >= 10
+        with pytest.raises(CommandError):
+            call_command('response_cache_stats')
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_shared_stats(self, settings, client):
+        settings.RESPONSE_CACHE_SHARED_STATS = True
+        settings.RESPONSE_CACHE_STATS_FLUSH = 3
+        for _ in range(4):
+            client.get('/api/v1/genres/')
+        assert get_stats() == {'hits': 3, 'misses': 1, 'hit_rate': 0.75}
+        assert cache.get(STATS_KEYS['hits']) == 2, (
+            'Проверьте, что счётчики сводятся в общий кеш пачками, '
+            'а не на каждом запросе'
+        )
+        out = StringIO()
+        call_command('response_cache_stats', reset=True, stdout=out)
+        assert 'Попаданий: 3, промахов: 1' in out.getvalue()
+        assert get_stats(shared=True)['hits'] == 0
@@ -0,0 +1,73 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_comments
+
+
+class Test17SparseFields:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_sparse_fields(self, client, admin_client, admin):
+        comments, reviews, titles, user, moderator = create_comments(admin_client, admin)
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/titles/?fields=id,name,rating')
+        assert response.status_code == 200
+        for title in response.json()['results']:
+            assert set(title) == {'id', 'name', 'rating'}, (
+                'Проверьте, что `?fields=` оставляет в ответе только перечисленные поля'
+            )
+        assert len(context.captured_queries) == 2, (
+            'Проверьте, что при `?fields=` без `genre` жанры не загружаются'
+        )
+        page_query = context.captured_queries[1]['sql']
+        assert '"description"' not in page_query and '"reviews_category"."slug"' not in page_query, (
+            'Проверьте, что неиспользуемые столбцы и связи не загружаются'
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/titles/?omit=description,genre')
+        title = response.json()['results'][0]
+        assert set(title) == {'id', 'name', 'year', 'rating', 'category'}, (
+            'Проверьте, что `?omit=` убирает перечисленные поля из ответа'
+        )
+        assert len(context.captured_queries) == 2
+
+        title = client.get(f'/api/v1/titles/{titles[0]["id"]}/?fields=histogram').json()
+        assert set(title) == {'histogram'} and title['histogram']['5'] == 1
+
+        review_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+        data = client.get(f'{review_url}comments/?omit=review,pub_date').json()
+        assert set(data['results'][0]) == {'id', 'text', 'author'}
+        assert set(client.get(f'{review_url}?fields=score').json()) == {'score'}
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_sparse_fields_do_not_change_validation(self, admin_client):
+        response = admin_client.post('/api/v1/titles/?fields=name', data={'name': 'Без года'})
+        assert response.status_code == 400, (
+            'Проверьте, что `?fields=` не отключает валидацию обязательных полей'
+        )
+        assert 'year' in response.json()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_sparse_fields_keep_parent_key(self, client, admin_client, admin):
+        comments, reviews, titles, user, moderator = create_comments(admin_client, admin)
+        review_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+        comment_url = f'{review_url}comments/{comments[0]["id"]}/'
+        for url, sparse in [
+            (comment_url, 'fields=text'),
+            (review_url, 'fields=score'),
+            (f'{review_url}comments/', 'fields=text'),
+            (f'/api/v1/titles/{titles[0]["id"]}/reviews/', 'omit=text'),
+        ]:
+            with CaptureQueriesContext(connection) as full:
+                client.get(url)
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(f'{url}?{sparse}')
+            assert response.status_code == 200
+            assert len(context.captured_queries) <= len(full.captured_queries), (
+                f'Проверьте, что `?{sparse}` не дозагружает внешний ключ '
+                f'родителя отдельным запросом на каждый объект: `{url}`'
+            )
+        assert client.get(f'{comment_url}?fields=text').json() == {'text': comments[0]['text']}
@@ -0,0 +1,75 @@
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+
+from api.views import CommentViewSet, ReviewViewSet, TitleViewSet
+from reviews.models import Title
+
+from .common import create_comments
+
+TITLE_QUERIES = [
+    '',
+    '?limit=1&offset=1',
+    '?fields=id,genre,histogram',
+    '?omit=category,description',
+    '?pagination=cursor&limit=1',
+    '?search=драма',
+    '?genre=comedy',
+]
+NESTED_QUERIES = [
+    '',
+    '?limit=2',
+    '?fields=author,pub_date',
+    '?omit=text',
+    '?pagination=cursor&limit=2',
+]
+
+
+def get_both(client, monkeypatch, viewset, url):
+    cache.clear()
+    fast = client.get(url)
+    cache.clear()
+    with monkeypatch.context() as patch:
+        patch.setattr(viewset, 'reader_class', None)
+        slow = client.get(url)
+    assert fast.status_code == slow.status_code == 200
+    return fast.content.decode(), slow.content.decode()
+
+
+class Test18ValuesReaders:
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('query', TITLE_QUERIES)
+    def test_01_titles_parity(self, client, admin_client, admin, monkeypatch, query):
+        create_comments(admin_client, admin)
+        Title.objects.create(name='Без категории', year=1990)
+        fast, slow = get_both(client, monkeypatch, TitleViewSet, f'/api/v1/titles/{query}')
+        assert fast == slow, (
+            'Проверьте, что список произведений через values() совпадает '
+            'с выводом TitleGetSerializer'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('query', NESTED_QUERIES)
+    def test_02_reviews_and_comments_parity(self, client, admin_client, admin, monkeypatch, query):
+        comments, reviews, titles, user, moderator = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        fast, slow = get_both(client, monkeypatch, ReviewViewSet, url + query)
+        assert fast == slow, (
+            'Проверьте, что список отзывов через values() совпадает '
+            'с выводом ReviewSerializer'
+        )
+        url = f'{url}{reviews[0]["id"]}/comments/'
+        fast, slow = get_both(client, monkeypatch, CommentViewSet, url + query)
+        assert fast == slow, (
+            'Проверьте, что список комментариев через values() совпадает '
+            'с выводом CommentSerializer'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_benchmark_command(self, admin_client, admin, capsys):
+        create_comments(admin_client, admin)
+        call_command('benchmark_readers', limit=10, repeat=1)
+        output = capsys.readouterr().out
+        for name in ('titles', 'reviews', 'comments'):
+            assert f'{name}: ' in output and 'мкс на элемент' in output
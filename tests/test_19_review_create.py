@@ -0,0 +1,53 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, Title
+
+from .common import auth_client, create_titles
+
+
+class Test19ReviewCreate:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_title_loaded_once(self, admin_client, admin):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(url, data={'text': 'Отзыв', 'score': 7})
+        assert response.status_code == 201
+        assert response.json()['title'] == titles[0]['id']
+        title_lookups = [
+            query for query in context.captured_queries
+            if query['sql'].startswith('SELECT "reviews_title"."id"')
+        ]
+        assert len(title_lookups) == 1, (
+            'Проверьте, что произведение загружается один раз за запрос '
+            'на создание отзыва'
+        )
+        assert not any(
+            'FROM "reviews_review"' in query['sql'] for query in context.captured_queries
+        ), 'Проверьте, что повторный отзыв отсекается ограничением, а не запросом exists()'
+
+        response = admin_client.post('/api/v1/titles/999/reviews/', data={'text': 'Отзыв', 'score': 7})
+        assert response.status_code == 404
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_duplicate_review_rejected_by_constraint(self, admin_client, admin):
+        titles, _, _ = create_titles(admin_client)
+        title = Title.objects.get(pk=titles[0]['id'])
+        # Отзыв, записанный в обход API, как при параллельном запросе
+        Review.objects.create(title=title, author=admin, text='Первый', score=10)
+
+        response = auth_client(admin).post(
+            f'/api/v1/titles/{title.id}/reviews/', data={'text': 'Второй', 'score': 1}
+        )
+        assert response.status_code == 400
+        assert response.json() == {'non_field_errors': ['Можно оставить только один отзыв']}, (
+            'Проверьте, что нарушение `uniq_author` возвращает прежнюю ошибку 400'
+        )
+        assert Review.objects.filter(title=title).count() == 1
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (10, 1), (
+            'Проверьте, что при отклонённом отзыве агрегаты рейтинга не меняются'
+        )
@@ -0,0 +1,46 @@
+import pytest
+
+from reviews.models import Comment
+
+from .common import create_comments
+
+
+class Test20CommentQueries:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_review_must_belong_to_title(self, client, admin_client, admin):
+        comments, reviews, titles, user, moderator = create_comments(admin_client, admin)
+        review_id = reviews[0]['id']
+        wrong_url = f'/api/v1/titles/{titles[1]["id"]}/reviews/{review_id}/comments/'
+        assert client.get(wrong_url).status_code == 404, (
+            'Проверьте, что комментарии отзыва недоступны по адресу чужого произведения'
+        )
+        assert client.get(f'{wrong_url}{comments[0]["id"]}/').status_code == 404
+        response = admin_client.post(wrong_url, data={'text': 'Не туда'})
+        assert response.status_code == 404, (
+            'Проверьте, что нельзя оставить комментарий к отзыву через чужое произведение'
+        )
+        assert not Comment.objects.filter(text='Не туда').exists()
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('mode, queries', [
+        # отзыв вместе с проверкой произведения, COUNT, страница с авторами
+        ('', 3),
+        # отзыв вместе с проверкой произведения, страница с авторами
+        ('&pagination=cursor', 2),
+    ])
+    def test_02_comment_list_query_budget(self, client, admin_client, admin,
+                                          django_assert_num_queries, mode, queries):
+        comments, reviews, titles, user, moderator = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/comments/'
+        for limit in (1, 3):
+            with django_assert_num_queries(queries):
+                response = client.get(f'{url}?limit={limit}{mode}')
+            assert response.status_code == 200
+            assert len(response.json()['results']) == limit
+
+        with django_assert_num_queries(2):
+            response = client.get(f'{url}{comments[0]["id"]}/')
+        assert response.json()['review'] == reviews[0]['id'], (
+            'Проверьте, что комментарий использует уже загруженный отзыв'
+        )
@@ -0,0 +1,60 @@
+import pytest
+
+from reviews.models import Comment, Review, Title
+
+from .common import create_titles
+
+
+def create_long_review(admin_client, admin, comments):
+    titles, _, _ = create_titles(admin_client)
+    review = Review.objects.create(
+        title=Title.objects.get(pk=titles[0]['id']), author=admin,
+        text='Очень длинный отзыв. ' * 500, score=8,
+    )
+    Comment.objects.bulk_create(
+        Comment(review=review, author=admin, text=f'Комментарий {number}')
+        for number in range(comments)
+    )
+    return review, f'/api/v1/titles/{titles[0]["id"]}/reviews/{review.id}/comments/'
+
+
+class Test21CommentPayload:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_compact_comments(self, client, admin_client, admin):
+        review, url = create_long_review(admin_client, admin, 10)
+        response = client.get(url)
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert len(results) == 10
+        assert all(comment['review'] == review.id for comment in results), (
+            'Проверьте, что комментарий ссылается на отзыв по id'
+        )
+        assert len(response.content) < len(review.text.encode()), (
+            'Проверьте, что текст отзыва не повторяется в каждом комментарии'
+        )
+        assert 'review' not in response.json()
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('mode', ['', '&pagination=cursor'])
+    def test_02_expand_review_once_per_page(self, client, admin_client, admin,
+                                            django_assert_num_queries, mode):
+        review, url = create_long_review(admin_client, admin, 10)
+        queries = 2 if mode else 3
+        with django_assert_num_queries(queries):
+            compact = client.get(f'{url}?limit=5{mode}')
+        with django_assert_num_queries(queries):
+            expanded = client.get(f'{url}?limit=5&expand=review{mode}')
+        assert expanded.status_code == 200
+        data = expanded.json()
+        assert data['review']['id'] == review.id
+        assert data['review']['author'] == admin.username
+        assert data['review']['text'] == review.text, (
+            'Проверьте, что `?expand=review` добавляет отзыв к странице'
+        )
+        assert data['results'] == compact.json()['results']
+        assert expanded.content.decode().count(review.text) == 1, (
+            'Проверьте, что при `?expand=review` отзыв выводится один раз на страницу'
+        )
+        size = len(compact.content) + len(review.text.encode())
+        assert len(expanded.content) < size + 1000
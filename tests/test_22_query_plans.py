@@ -0,0 +1,54 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_comments
+
+
+def page_query_plan(client, url, table):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    sql = next(
+        query['sql'] for query in reversed(context.captured_queries)
+        if query['sql'].startswith('SELECT') and f'FROM "{table}"' in query['sql']
+        and 'COUNT(' not in query['sql']
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def assert_uses_index(plan, index):
+    assert any(index in step for step in plan), (
+        f'Проверьте, что запрос страницы использует индекс `{index}`: {plan}'
+    )
+    assert not any('TEMP B-TREE' in step for step in plan), (
+        f'Проверьте, что страница сортируется по индексу, без временного B-дерева: {plan}'
+    )
+
+
+@pytest.mark.skipif(connection.vendor != 'sqlite', reason='EXPLAIN QUERY PLAN есть только в SQLite')
+class Test22QueryPlans:
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('mode', ['', '&pagination=cursor'])
+    def test_01_list_queries_use_indexes(self, client, admin_client, admin, mode):
+        comments, reviews, titles, user, moderator = create_comments(admin_client, admin)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        review_url = f'{title_url}reviews/{reviews[0]["id"]}/'
+
+        plan = page_query_plan(client, f'/api/v1/titles/?limit=1{mode}', 'reviews_title')
+        assert_uses_index(plan, 'title_category_name')
+        plan = page_query_plan(client, f'{title_url}reviews/?limit=1{mode}', 'reviews_review')
+        assert_uses_index(plan, 'review_title_score_date')
+        plan = page_query_plan(client, f'{review_url}comments/?limit=1{mode}', 'reviews_comment')
+        assert_uses_index(plan, 'comment_review_date')
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_genre_filter_uses_index(self, client, admin_client, admin):
+        create_comments(admin_client, admin)
+        plan = page_query_plan(client, '/api/v1/titles/?genre=comedy', 'reviews_title')
+        assert any('genre_title_genre' in step for step in plan), (
+            f'Проверьте, что фильтр по жанру использует индекс `genre_title_genre`: {plan}'
+        )
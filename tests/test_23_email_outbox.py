@@ -0,0 +1,158 @@
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+from reviews.models import OutgoingEmail, User
+from reviews.outbox import enqueue_email
+
+
+class CountingBackend(EmailBackend):
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return True
+
+
+class FailingBackend(EmailBackend):
+
+    def open(self):
+        raise ConnectionRefusedError('SMTP недоступен')
+
+
+class TransactionCheckingBackend(EmailBackend):
+    in_transaction = []
+
+    def send_messages(self, messages):
+        TransactionCheckingBackend.in_transaction.append(
+            connection.in_atomic_block
+        )
+        return super().send_messages(messages)
+
+
+class CrashingBackend(EmailBackend):
+
+    def send_messages(self, messages):
+        raise SystemExit('отправитель упал')
+
+
+class Test23EmailOutbox:
+    url_signup = '/api/v1/auth/signup/'
+    data = {'email': 'outbox@yamdb.fake', 'username': 'outbox'}
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_signup_enqueues_email(self, client):
+        response = client.post(self.url_signup, data=self.data)
+        assert response.status_code == 200
+        assert mail.outbox == [], (
+            'Проверьте, что регистрация не отправляет письмо внутри запроса'
+        )
+        email = OutgoingEmail.objects.get()
+        assert email.recipient == self.data['email'] and email.sent_at is None
+
+        call_command('send_emails')
+        assert [message.to for message in mail.outbox] == [[self.data['email']]], (
+            'Проверьте, что команда `send_emails` отправляет письма из очереди'
+        )
+        email.refresh_from_db()
+        assert email.sent_at is not None and email.attempts == 1
+        call_command('send_emails')
+        assert len(mail.outbox) == 1, 'Проверьте, что письмо отправляется один раз'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_failed_signup_does_not_enqueue(self, client):
+        User.objects.create(username='other', email=self.data['email'])
+        response = client.post(self.url_signup, data=self.data)
+        assert response.status_code == 400
+        assert not OutgoingEmail.objects.exists()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_one_connection_per_batch(self, settings):
+        settings.EMAIL_BACKEND = f'{__name__}.CountingBackend'
+        CountingBackend.opened = 0
+        enqueue_email('Тема', 'Текст', [f'user{n}@yamdb.fake' for n in range(5)])
+        call_command('send_emails', batch_size=2)
+        assert len(mail.outbox) == 5
+        assert CountingBackend.opened == 3, (
+            'Проверьте, что на каждую пачку писем открывается одно соединение'
+        )
+        assert not OutgoingEmail.objects.filter(sent_at__isnull=True).exists()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_retry_with_backoff(self, client, settings):
+        settings.EMAIL_BACKEND = f'{__name__}.FailingBackend'
+        settings.EMAIL_OUTBOX_RETRY_DELAY = 60
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 3
+        response = client.post(self.url_signup, data=self.data)
+        assert response.status_code == 200, (
+            'Проверьте, что недоступность почтового сервера не ломает регистрацию'
+        )
+
+        delays = []
+        for _ in range(3):
+            started = timezone.now()
+            call_command('send_emails')
+            email = OutgoingEmail.objects.get()
+            delays.append(round((email.next_attempt_at - started).total_seconds() / 60))
+            call_command('send_emails')
+            assert OutgoingEmail.objects.get().attempts == email.attempts, (
+                'Проверьте, что письмо не отправляется повторно до истечения задержки'
+            )
+            OutgoingEmail.objects.update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+        assert delays == [1, 2, 4], 'Проверьте, что задержка между попытками удваивается'
+        assert 'SMTP недоступен' in email.last_error
+
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        call_command('send_emails')
+        assert mail.outbox == [], (
+            'Проверьте, что после исчерпания попыток письмо больше не отправляется'
+        )
+        OutgoingEmail.objects.update(attempts=0)
+        call_command('send_emails')
+        assert len(mail.outbox) == 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_file_backend(self, settings, tmp_path):
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+        settings.EMAIL_FILE_PATH = str(tmp_path)
+        enqueue_email('Тема', 'Код: 123', ['file@yamdb.fake', 'copy@yamdb.fake'])
+        call_command('send_emails')
+        files = list(tmp_path.iterdir())
+        assert len(files) == 1, 'Проверьте, что пачка уходит через одно соединение'
+        content = files[0].read_text()
+        assert 'file@yamdb.fake' in content and 'copy@yamdb.fake' in content
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_sends_outside_transaction(self, settings):
+        settings.EMAIL_BACKEND = f'{__name__}.TransactionCheckingBackend'
+        TransactionCheckingBackend.in_transaction = []
+        enqueue_email('Тема', 'Текст', ['a@yamdb.fake', 'b@yamdb.fake'])
+        call_command('send_emails')
+        assert TransactionCheckingBackend.in_transaction == [False, False], (
+            'Проверьте, что письма отправляются вне транзакции базы'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_07_crashed_sender_releases_lease(self, settings):
+        settings.EMAIL_BACKEND = f'{__name__}.CrashingBackend'
+        settings.EMAIL_OUTBOX_LEASE = 300
+        enqueue_email('Тема', 'Текст', ['lease@yamdb.fake'])
+        with pytest.raises(SystemExit):
+            call_command('send_emails')
+        email = OutgoingEmail.objects.get()
+        assert email.attempts == 1 and email.sent_at is None
+        assert email.next_attempt_at > timezone.now() + timedelta(seconds=200), (
+            'Проверьте, что забранное письмо откладывается на срок аренды'
+        )
+
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        call_command('send_emails')
+        assert mail.outbox == []
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+        call_command('send_emails')
+        assert len(mail.outbox) == 1
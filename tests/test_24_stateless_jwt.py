@@ -0,0 +1,119 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.models import Review, User
+
+from .common import create_titles
+
+
+def obtain_token(user):
+    user.confirmation_code = 'code'
+    user.save()
+    response = APIClient().post(
+        '/api/v1/auth/token/',
+        data={'username': user.username, 'confirmation_code': 'code'},
+    )
+    assert response.status_code == 200
+    return response.json()['token']
+
+
+def token_client(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+def user_queries(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if 'FROM "reviews_user"' in query['sql']
+    ]
+
+
+class Test24StatelessJWT:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_token_claims(self, user_superuser):
+        raw_token = obtain_token(user_superuser)
+        token = AccessToken(raw_token)
+        assert token['username'] == user_superuser.username
+        assert token['role'] == 'user'
+        assert token['is_superuser'] is True
+        assert token['ver'] == user_superuser.auth_version, (
+            'Проверьте, что токен из `/auth/token/` содержит роль и версию учётных данных'
+        )
+        assert token_client(raw_token).get('/api/v1/users/').status_code == 200
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_no_user_query_per_request(self, admin):
+        client = token_client(obtain_token(admin))
+        client.get('/api/v1/users/')
+        with CaptureQueriesContext(connection) as context:
+            response = client.post('/api/v1/categories/', data={'name': 'Фильм', 'slug': 'films'})
+        assert response.status_code == 201
+        assert user_queries(context) == [], (
+            'Проверьте, что для проверки прав пользователь не загружается из базы'
+        )
+
+        titles, _, _ = create_titles(client)
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(
+                f'/api/v1/titles/{titles[0]["id"]}/reviews/', data={'text': 'Отзыв', 'score': 9}
+            )
+        assert response.status_code == 201 and response.json()['author'] == admin.username
+        assert user_queries(context) == []
+        assert Review.objects.get().author == admin
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/users/me/')
+        assert response.json()['email'] == admin.email
+        assert len(user_queries(context)) == 1, (
+            'Проверьте, что остальные поля пользователя загружаются одним запросом'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_role_change_revokes_token(self, admin_client, admin):
+        user = User.objects.create(username='demoted', email='demoted@yamdb.fake', role='admin')
+        client = token_client(obtain_token(user))
+        assert client.get('/api/v1/users/').status_code == 200
+
+        admin_client.patch('/api/v1/users/demoted/', data={'role': 'user'})
+        response = client.get('/api/v1/users/')
+        assert response.status_code == 401, (
+            'Проверьте, что смена роли отзывает ранее выданный токен'
+        )
+        user.refresh_from_db()
+        client = token_client(obtain_token(user))
+        assert client.get('/api/v1/users/').status_code == 403
+        assert client.get('/api/v1/users/me/').json()['role'] == 'user'
+
+        user.is_active = False
+        user.save()
+        assert client.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что блокировка пользователя отзывает токен'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_profile_edit_keeps_token(self, admin):
+        user = User.objects.create(username='writer', email='writer@yamdb.fake')
+        client = token_client(obtain_token(user))
+        response = client.patch('/api/v1/users/me/', data={'bio': 'О себе'})
+        assert response.status_code == 200
+        assert client.get('/api/v1/users/me/').json()['bio'] == 'О себе', (
+            'Проверьте, что изменение профиля не отзывает токен'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_update_bypassing_signals(self, settings):
+        settings.AUTH_VERSION_CACHE_TIMEOUT = 0
+        user = User.objects.create(username='bypassed', email='bypassed@yamdb.fake', role='admin')
+        client = token_client(obtain_token(user))
+        assert client.get('/api/v1/users/').status_code == 200
+        User.objects.filter(pk=user.pk).update(role='user')
+        assert client.get('/api/v1/users/').status_code == 401, (
+            'Проверьте, что смена роли через `update()` отзывает токен '
+            'не позже срока кеширования версии учётных данных'
+        )
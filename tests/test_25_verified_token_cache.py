@@ -0,0 +1,54 @@
+import time
+from unittest import mock
+
+import pytest
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.authentication import VerifiedTokenCache, access_token_for, verified_tokens
+
+from .test_24_stateless_jwt import token_client
+
+
+class Test25VerifiedTokenCache:
+
+    def test_01_lru_and_expiry(self):
+        tokens = VerifiedTokenCache(max_size=2)
+        future = time.time() + 60
+        tokens.put('a', {'exp': future})
+        tokens.put('b', {'exp': future})
+        assert tokens.get('a') == {'exp': future}
+        tokens.put('c', {'exp': future})
+        assert tokens.get('b') is None, (
+            'Проверьте, что при переполнении вытесняется давно не использованный токен'
+        )
+        assert tokens.get('a') is not None and tokens.get('c') is not None
+
+        tokens.put('old', {'exp': time.time() - 1})
+        assert tokens.get('old') is None, (
+            'Проверьте, что истёкший токен не возвращается из кеша'
+        )
+        assert tokens.stats() == {
+            'hits': 3, 'misses': 2, 'hit_rate': 0.6, 'size': 1, 'max_size': 2,
+        }
+        tokens.clear()
+        assert tokens.stats()['size'] == 0 and tokens.stats()['hits'] == 0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_repeat_requests_skip_verification(self, admin):
+        verified_tokens.clear()
+        client = token_client(str(access_token_for(admin)))
+        with mock.patch.object(AccessToken, 'verify', autospec=True,
+                               side_effect=AccessToken.verify) as verify:
+            for _ in range(3):
+                assert client.get('/api/v1/users/').status_code == 200
+        assert verify.call_count == 1, (
+            'Проверьте, что подпись одного и того же токена проверяется один раз'
+        )
+        stats = verified_tokens.stats()
+        assert stats['hits'] == 2 and stats['misses'] == 1
+
+        response = token_client('not.a.token').get('/api/v1/users/')
+        assert response.status_code == 401
+        assert verified_tokens.stats()['size'] == 1, (
+            'Проверьте, что в кеш попадают только проверенные токены'
+        )
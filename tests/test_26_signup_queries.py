@@ -0,0 +1,50 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.bloom import user_filter
+from reviews.models import User
+
+from .test_24_stateless_jwt import user_queries
+
+
+def user_selects(context):
+    return [sql for sql in user_queries(context) if sql.startswith('SELECT')]
+
+
+class Test26SignupQueries:
+    url_signup = '/api/v1/auth/signup/'
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('data, code, queries', [
+        # имя и email точно свободны по фильтру Блума
+        ({'username': 'new', 'email': 'new@yamdb.fake'}, 200, 0),
+        ({'username': 'owner', 'email': 'owner@yamdb.fake'}, 200, 1),
+        ({'username': 'new', 'email': 'owner@yamdb.fake'}, 400, 1),
+        ({'username': 'owner', 'email': 'other@yamdb.fake'}, 400, 1),
+        ({'username': 'owner', 'email': 'taken@yamdb.fake'}, 400, 1),
+    ])
+    def test_01_signup_single_user_query(self, client, data, code, queries):
+        User.objects.create(username='owner', email='owner@yamdb.fake')
+        User.objects.create(username='taken', email='taken@yamdb.fake')
+        user_filter.get_filters()
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(self.url_signup, data=data)
+        assert response.status_code == code
+        assert len(user_selects(context)) == queries, (
+            'Проверьте, что регистрация выясняет владельцев имени и email одним запросом'
+        )
+        created = code == 200 and data['username'] == 'new'
+        assert User.objects.count() == (3 if created else 2)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_token_single_user_query(self, client):
+        User.objects.create(username='owner', email='owner@yamdb.fake', confirmation_code='code')
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(
+                '/api/v1/auth/token/', data={'username': 'owner', 'confirmation_code': 'code'}
+            )
+        assert response.status_code == 200 and response.json()['token']
+        assert len(user_selects(context)) == 1, (
+            'Проверьте, что пользователь загружается один раз при выдаче токена'
+        )
@@ -0,0 +1,143 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews import bloom
+from reviews.bloom import BloomFilter, user_filter
+from reviews.models import User
+
+from .test_26_signup_queries import user_selects
+
+
+class Test27UserFilter:
+    url_available = '/api/v1/auth/available/'
+
+    def test_01_bloom_filter(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        members = [f'user{number}' for number in range(1000)]
+        for member in members:
+            bloom.add(member)
+        assert all(member in bloom for member in members), (
+            'Проверьте, что фильтр Блума не даёт ложноотрицательных ответов'
+        )
+        false_positives = sum(f'other{number}' in bloom for number in range(10000))
+        assert false_positives < 200, (
+            'Проверьте, что доля ложных срабатываний близка к заданной'
+        )
+        assert bloom.hashes == 7 and bloom.memory == 1199
+        assert 0.005 < bloom.expected_error_rate() < 0.015
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_availability(self, client):
+        User.objects.create(username='taken', email='taken@yamdb.fake')
+        assert client.get(self.url_available).status_code == 400
+        response = client.get(self.url_available, {'username': 'taken', 'email': 'free@yamdb.fake'})
+        assert response.status_code == 200
+        assert response.json() == {'username': False}, (
+            'Проверьте, что `/auth/available/` не сообщает, занят ли email'
+        )
+        assert client.get(self.url_available, {'email': 'taken@yamdb.fake'}).status_code == 400
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(self.url_available, {'username': 'free'})
+        assert response.json() == {'username': True}
+        assert user_selects(context) == [], (
+            'Проверьте, что свободное по фильтру Блума имя не проверяется запросом к базе'
+        )
+
+        client.post('/api/v1/auth/signup/', data={'username': 'free', 'email': 'free@yamdb.fake'})
+        response = client.get(self.url_available, {'username': 'free'})
+        assert response.json() == {'username': False}, (
+            'Проверьте, что новый пользователь сразу попадает в фильтр'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_stale_filter_falls_back_to_database(self, client, settings):
+        user_filter.get_filters()
+        # Пользователь, созданный в обход сигналов (например, другим процессом)
+        User.objects.bulk_create([User(username='hidden', email='hidden@yamdb.fake')])
+        url = '/api/v1/auth/signup/'
+        response = client.post(url, data={'username': 'hidden', 'email': 'other@yamdb.fake'})
+        assert response.status_code == 400, (
+            'Проверьте, что при устаревшем фильтре регистрация опирается на ограничения базы'
+        )
+        response = client.post(url, data={'username': 'hidden', 'email': 'hidden@yamdb.fake'})
+        assert response.status_code == 200
+        assert User.objects.filter(username='hidden').count() == 1
+
+        User.objects.bulk_create([User(username='later', email='later@yamdb.fake')])
+        settings.USER_FILTER_MAX_AGE = 0
+        response = client.get(self.url_available, {'username': 'later'})
+        assert response.json() == {'username': False}, (
+            'Проверьте, что фильтр периодически перестраивается'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_stats_command(self, capsys):
+        User.objects.create(username='one', email='one@yamdb.fake')
+        call_command('user_filter_stats')
+        output = capsys.readouterr().out
+        assert 'username: элементов 1' in output and 'email: элементов 1' in output
+        assert 'КиБ' in output
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_availability_is_throttled(self, client, settings):
+        settings.AUTH_THROTTLES = {
+            **settings.AUTH_THROTTLES, 'available': [('ip', 'token_bucket', 2, 60)],
+        }
+        for _ in range(2):
+            assert client.get(self.url_available, {'username': 'x'}).status_code == 200
+        assert client.get(self.url_available, {'username': 'x'}).status_code == 429, (
+            'Проверьте, что проверка имени ограничена по частоте'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_rebuild_does_not_block_readers(self, settings):
+        User.objects.create(username='old', email='old@yamdb.fake')
+        filters = user_filter.get_filters()
+        settings.USER_FILTER_MAX_AGE = 0
+        # Другой поток уже перестраивает фильтры
+        assert user_filter._build_lock.acquire(blocking=False)
+        try:
+            assert user_filter.get_filters() is filters, (
+                'Проверьте, что во время перестроения используются прежние фильтры'
+            )
+        finally:
+            user_filter._build_lock.release()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_07_users_added_during_rebuild_are_kept(self, monkeypatch):
+        class AddingBloomFilter(BloomFilter):
+            def __init__(self, *args):
+                super().__init__(*args)
+                if not added:
+                    added.append(True)
+                    user_filter.add(User(username='racer', email='racer@yamdb.fake'))
+
+        added = []
+        monkeypatch.setattr(bloom, 'BloomFilter', AddingBloomFilter)
+        user_filter.build()
+        assert user_filter.might_contain('username', 'racer'), (
+            'Проверьте, что пользователи, созданные во время перестроения, не теряются'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_08_warm_up_and_incremental_refresh(self, settings):
+        User.objects.create(username='first', email='first@yamdb.fake')
+        user_filter.warm_up()
+        assert user_filter.filters is not None, (
+            'Проверьте, что фильтры строятся при старте процесса, а не на первом запросе'
+        )
+        User.objects.bulk_create([User(username='second', email='second@yamdb.fake')])
+        settings.USER_FILTER_MAX_AGE = 0
+        filters = user_filter.filters
+        with CaptureQueriesContext(connection) as context:
+            assert user_filter.might_contain('username', 'second')
+        assert user_filter.filters is filters
+        sql = [query['sql'] for query in context.captured_queries]
+        assert len(sql) == 1 and '"id" >' in sql[0], (
+            'Проверьте, что фильтр дочитывает только пользователей с id '
+            'больше последнего прочитанного'
+        )
+        assert user_filter.might_contain('username', 'first')
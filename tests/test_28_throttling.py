@@ -0,0 +1,134 @@
+import time
+
+import pytest
+from django.core.management import call_command
+
+from api.throttling import (MemoryStore, SlidingWindow, SQLiteStore,
+                            TokenBucket)
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+
+
+def signup(client, username, ip='10.0.0.1'):
+    return client.post(
+        SIGNUP_URL, data={'username': username, 'email': f'{username}@yamdb.fake'},
+        REMOTE_ADDR=ip,
+    )
+
+
+class Test28Throttling:
+
+    def test_01_token_bucket(self):
+        bucket = TokenBucket(3, 60)
+        state = None
+        for _ in range(3):
+            state, wait = bucket(state, 0)
+            assert wait == 0
+        state, wait = bucket(state, 0)
+        assert wait == pytest.approx(20), (
+            'Проверьте, что пустая корзина сообщает время до следующего токена'
+        )
+        state, wait = bucket(state, 20)
+        assert wait == 0
+
+    def test_02_sliding_window(self):
+        window = SlidingWindow(2, 60)
+        state = None
+        for _ in range(2):
+            state, wait = window(state, 10)
+            assert wait == 0
+        state, wait = window(state, 50)
+        assert wait > 0, 'Проверьте, что окно не пропускает больше лимита'
+        state, wait = window(state, 65)
+        assert wait > 0, (
+            'Проверьте, что запросы предыдущего окна учитываются в скользящем окне'
+        )
+        state, wait = window(state, 90)
+        assert wait == 0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_signup_throttled_per_ip(self, client, settings):
+        settings.AUTH_THROTTLES = {
+            'signup': [('ip', 'token_bucket', 2, 60)], 'token': [],
+        }
+        assert signup(client, 'first').status_code == 200
+        assert signup(client, 'second').status_code == 200
+        response = signup(client, 'third')
+        assert response.status_code == 429, (
+            'Проверьте, что регистрация ограничена по IP-адресу'
+        )
+        assert 1 <= int(response['Retry-After']) <= 30, (
+            'Проверьте, что ответ 429 содержит заголовок `Retry-After`'
+        )
+        assert signup(client, 'third', ip='10.0.0.2').status_code == 200
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_token_throttled_per_username(self, client, settings):
+        settings.AUTH_THROTTLES = {
+            'signup': [], 'token': [('username', 'sliding_window', 2, 600)],
+        }
+        url = '/api/v1/auth/token/'
+        for number in range(2):
+            response = client.post(
+                url, data={'username': 'victim', 'confirmation_code': 'guess'},
+                REMOTE_ADDR=f'10.0.1.{number}',
+            )
+            assert response.status_code == 404
+        response = client.post(
+            url, data={'username': 'VICTIM', 'confirmation_code': 'guess'}, REMOTE_ADDR='10.0.1.9'
+        )
+        assert response.status_code == 429, (
+            'Проверьте, что подбор кода для одного имени ограничен независимо от IP'
+        )
+        assert int(response['Retry-After']) > 0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_sqlite_store_shared_between_workers(self, client, settings, tmp_path):
+        path = str(tmp_path / 'throttle.sqlite3')
+        settings.THROTTLE_STORE = 'sqlite'
+        settings.THROTTLE_SQLITE_PATH = path
+        settings.AUTH_THROTTLES = {
+            'signup': [('ip', 'token_bucket', 2, 60)], 'token': [],
+        }
+        assert signup(client, 'first').status_code == 200
+        # Другой воркер с тем же файлом видит израсходованный токен
+        other_worker = SQLiteStore(path)
+        wait = other_worker.apply('signup:ip:token_bucket:60:10.0.0.1', TokenBucket(2, 60), time.time())
+        assert wait == 0
+        response = signup(client, 'second')
+        assert response.status_code == 429, (
+            'Проверьте, что хранилище SQLite общее для всех воркеров'
+        )
+
+    def test_06_benchmark_command(self, capsys):
+        call_command('benchmark_throttle', iterations=50, keys=5)
+        output = capsys.readouterr().out
+        assert 'memory token_bucket' in output and 'sqlite sliding_window' in output
+        assert 'мкс на проверку' in output
+
+    @pytest.mark.django_db(transaction=True)
+    def test_07_non_object_body(self, client):
+        for url in (SIGNUP_URL, '/api/v1/auth/token/'):
+            response = client.post(
+                url, data='[1, 2]', content_type='application/json'
+            )
+            assert response.status_code == 400, (
+                'Проверьте, что тело-не-объект даёт 400, а не ошибку сервера'
+            )
+
+    def test_08_memory_store_is_bounded(self):
+        store = MemoryStore(max_keys=100)
+        bucket = TokenBucket(5, 60)
+        for number in range(1000):
+            store.apply(f'signup:username:{number}', bucket, 0)
+        assert len(store) == 100, (
+            'Проверьте, что хранилище в памяти не растёт без ограничений'
+        )
+        store.apply('other', bucket, 1000)
+        store.cleanup(1000)
+        assert len(store) == 1, (
+            'Проверьте, что устаревшие состояния удаляются'
+        )
+        for _ in range(4):
+            assert store.apply('other', bucket, 1000) == 0
+        assert store.apply('other', bucket, 1000) > 0
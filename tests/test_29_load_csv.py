@@ -0,0 +1,95 @@
+import csv
+import os
+import shutil
+from datetime import datetime, timezone
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from reviews.csv_data import DATA_DIR
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+
+def count_rows(name, directory=DATA_DIR):
+    with open(os.path.join(directory, f'{name}.csv'), newline='',
+              encoding='utf-8') as file:
+        return sum(1 for _ in csv.DictReader(file))
+
+
+def load(*args, **options):
+    out = StringIO()
+    call_command('load_csv', *args, stdout=out, **options)
+    return out.getvalue()
+
+
+class Test29LoadCsv:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_loads_all_files(self):
+        output = load(batch_size=10)
+        expected = {
+            User: 'users',
+            Category: 'category',
+            Genre: 'genre',
+            Title: 'titles',
+            Title.genre.through: 'genre_title',
+            Review: 'review',
+            Comment: 'comments',
+        }
+        for model, name in expected.items():
+            assert model.objects.count() == count_rows(name), (
+                f'Проверьте, что `load_csv` загружает все строки `{name}.csv`'
+            )
+        assert 'строк/с' in output, (
+            'Проверьте, что `load_csv` сообщает скорость загрузки'
+        )
+
+        review = Review.objects.get(pk=1)
+        assert review.author_id == 100 and review.title_id == 1
+        assert review.pub_date == datetime(
+            2019, 9, 24, 21, 8, 21, 567000, tzinfo=timezone.utc
+        ), 'Проверьте, что `load_csv` сохраняет дату отзыва из файла'
+        assert Title.objects.get(pk=1).genre.exists()
+        rated = Title.objects.exclude(rating=None)
+        assert rated.exists(), (
+            'Проверьте, что после загрузки отзывов пересчитываются рейтинги'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_rerun_updates_rows(self, tmp_path):
+        load()
+        data_dir = tmp_path / 'data'
+        shutil.copytree(DATA_DIR, data_dir)
+        path = data_dir / 'category.csv'
+        with open(path, newline='', encoding='utf-8') as file:
+            rows = list(csv.DictReader(file))
+        rows[0]['name'] = 'Новое имя'
+        with open(path, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames=rows[0].keys())
+            writer.writeheader()
+            writer.writerows(rows)
+
+        output = load(path=str(data_dir))
+        assert Category.objects.count() == count_rows('category')
+        assert Review.objects.count() == count_rows('review'), (
+            'Проверьте, что повторный запуск `load_csv` не создаёт дубликаты'
+        )
+        assert Category.objects.get(pk=rows[0]['id']).name == 'Новое имя', (
+            'Проверьте, что повторный запуск `load_csv` обновляет строки'
+        )
+        assert 'новых 0' in output
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_new_rows_get_fresh_ids(self):
+        load('users', 'category')
+        category = Category.objects.create(name='Ещё', slug='more')
+        assert category.pk > max(
+            Category.objects.exclude(pk=category.pk)
+            .values_list('pk', flat=True)
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_unknown_table(self):
+        with pytest.raises(CommandError):
+            load('nothing')
@@ -0,0 +1,121 @@
+import csv
+import json
+import shutil
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from reviews.csv_data import (DATA_DIR, TABLES_BY_NAME, read_rows,
+                              read_rows_parallel, record_boundaries)
+from reviews.models import Comment, Review, Title, User
+
+
+def write_reviews(path, count):
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(['id', 'title_id', 'text', 'author', 'score',
+                         'pub_date'])
+        for number in range(1, count + 1):
+            writer.writerow([
+                number,
+                number % 30 + 1,
+                f'Строка "{number}"\nпродолжение, с запятой\n\nконец',
+                100 + number % 5,
+                number % 10 + 1,
+                '2020-01-01T10:00:00.000Z',
+            ])
+
+
+class Test30ParallelImport:
+
+    def test_01_boundaries_keep_quoted_newlines(self, tmp_path):
+        path = str(tmp_path / 'review.csv')
+        write_reviews(path, 200)
+        boundaries = record_boundaries(path, 300)
+        assert len(boundaries) > 10
+        table = TABLES_BY_NAME['review']
+        sequential = list(read_rows(table, path))
+        assert len(sequential) == 200
+        parallel = list(read_rows_parallel(table, path, 1, 300))
+        assert parallel == sequential, (
+            'Проверьте, что диапазоны байтов не разрывают записи CSV '
+            'с переводами строк в кавычках'
+        )
+
+    def test_02_process_pool_keeps_order(self, tmp_path):
+        path = str(tmp_path / 'review.csv')
+        write_reviews(path, 500)
+        table = TABLES_BY_NAME['review']
+        assert list(read_rows_parallel(table, path, 3, 1000)) == list(
+            read_rows(table, path)
+        ), 'Проверьте, что разбор в пуле процессов сохраняет порядок строк'
+
+    def test_03_ndjson(self, tmp_path):
+        table = TABLES_BY_NAME['comments']
+        rows = [
+            {'id': number, 'review_id': 1, 'text': f'а\nб {number}',
+             'author': 100, 'pub_date': '2020-01-01T10:00:00Z'}
+            for number in range(1, 101)
+        ]
+        path = str(tmp_path / 'comments.ndjson')
+        with open(path, 'w', encoding='utf-8') as file:
+            for row in rows:
+                file.write(json.dumps(row, ensure_ascii=False) + '\n')
+        parsed = list(read_rows_parallel(table, path, 2, 500))
+        assert [values[0] for values in parsed] == list(range(1, 101))
+        assert parsed == list(read_rows(table, path))
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_load_csv_with_workers(self, tmp_path):
+        data_dir = tmp_path / 'data'
+        shutil.copytree(DATA_DIR, data_dir)
+        call_command('load_csv', path=str(data_dir), workers=2,
+                     chunk_bytes=2048, stdout=StringIO())
+        expected = read_rows(
+            TABLES_BY_NAME['review'], str(data_dir / 'review.csv')
+        )
+        assert Review.objects.count() == len(list(expected))
+        assert Comment.objects.count() > 0
+        review = Review.objects.get(pk=1)
+        assert review.text.startswith('Ставлю десять звёзд!\n'), (
+            'Проверьте, что параллельная загрузка сохраняет многострочный '
+            'текст отзыва'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_invalid_rows_are_reported(self, tmp_path):
+        data_dir = tmp_path / 'data'
+        shutil.copytree(DATA_DIR, data_dir)
+        path = data_dir / 'review.csv'
+        text = path.read_text(encoding='utf-8')
+        path.write_text(text.replace(',100,10,', ',100,42,', 1),
+                        encoding='utf-8')
+        with pytest.raises(CommandError, match='review.csv'):
+            call_command('load_csv', 'users', 'category', 'genre', 'titles',
+                         'review', path=str(data_dir), workers=2,
+                         chunk_bytes=2048, stdout=StringIO())
+        assert not Review.objects.exists(), (
+            'Проверьте, что ошибка в файле откатывает его загрузку целиком'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_ndjson_export_with_line_separators(self, tmp_path):
+        title = Title.objects.create(name='Произведение', year=2000)
+        texts = ['абзац\u2028строка', 'конец\x85строки', 'разрыв\u2029\x0c']
+        Review.objects.bulk_create(
+            Review(title=title, author=User.objects.create(
+                username=f'author{number}', email=f'author{number}@ya.ru'
+            ), text=texts[number % 3], score=5)
+            for number in range(30)
+        )
+        call_command('export', 'review', output=str(tmp_path),
+                     file_format='ndjson', stdout=StringIO())
+        path = str(tmp_path / 'review.ndjson')
+        table = TABLES_BY_NAME['review']
+        sequential = list(read_rows(table, path))
+        assert len(sequential) == 30
+        assert list(read_rows_parallel(table, path, 2, 256)) == sequential, (
+            'Проверьте, что NDJSON делится на записи только по `\\n`: '
+            'U+2028 и NEL внутри строк не разрывают запись'
+        )
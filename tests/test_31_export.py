@@ -0,0 +1,98 @@
+import gzip
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from reviews.csv_data import TABLES
+from reviews.models import Category, Genre, Review, Title, User
+
+
+def snapshot():
+    return {
+        table.name: list(
+            table.model._base_manager.order_by('pk')
+            .values_list(*table.fields)
+        )
+        for table in TABLES
+    }
+
+
+def clear_tables():
+    for model in (Review, Title, Genre, Category, User):
+        model._base_manager.all().delete()
+
+
+class Test31Export:
+    url = '/api/v1/export/review.csv'
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('options', [
+        {'file_format': 'csv'},
+        {'file_format': 'ndjson', 'gzip': True},
+    ])
+    def test_01_round_trip(self, tmp_path, options):
+        call_command('load_csv', stdout=StringIO())
+        before = snapshot()
+        out = StringIO()
+        call_command('export', output=str(tmp_path), chunk_size=7,
+                     stdout=out, **options)
+        assert 'строк/с' in out.getvalue()
+        assert not list(tmp_path.glob('*.tmp'))
+
+        clear_tables()
+        assert not Review.objects.exists()
+        call_command('load_csv', path=str(tmp_path), stdout=StringIO())
+        assert snapshot() == before, (
+            'Проверьте, что выгрузка `export` загружается `load_csv` '
+            'без потерь'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_csv_layout(self, tmp_path):
+        call_command('load_csv', 'users', 'category', stdout=StringIO())
+        call_command('export', 'category', output=str(tmp_path),
+                     stdout=StringIO())
+        lines = (tmp_path / 'category.csv').read_text().splitlines()
+        assert lines[0] == 'id,name,slug', (
+            'Проверьте, что заголовок выгрузки совпадает с static/data'
+        )
+        assert len(lines) == Category.objects.count() + 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_endpoint_is_admin_only(self, client, user_client):
+        assert client.get(self.url).status_code == 401
+        assert user_client.get(self.url).status_code == 403
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_endpoint_streams(self, admin_client, tmp_path):
+        call_command('load_csv', stdout=StringIO())
+        call_command('export', 'review', output=str(tmp_path),
+                     stdout=StringIO())
+        response = admin_client.get(self.url)
+        assert response.status_code == 200
+        assert response.streaming, (
+            'Проверьте, что выгрузка отдаётся `StreamingHttpResponse`'
+        )
+        assert response['Content-Type'].startswith('text/csv')
+        assert 'review.csv' in response['Content-Disposition']
+        content = b''.join(response.streaming_content)
+        assert content == (tmp_path / 'review.csv').read_bytes()
+
+        response = admin_client.get('/api/v1/export/comments.ndjson.gz')
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/gzip'
+        lines = gzip.decompress(
+            b''.join(response.streaming_content)
+        ).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        assert [row['id'] for row in rows] == sorted(
+            row['id'] for row in rows
+        )
+        assert set(rows[0]) == {'id', 'review_id', 'text', 'author',
+                                'pub_date'}
+
+        assert admin_client.get(
+            '/api/v1/export/unknown.csv'
+        ).status_code == 404
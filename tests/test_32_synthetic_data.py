@@ -0,0 +1,81 @@
+import random
+from collections import Counter
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count
+
+from reviews.models import Comment, Review, Title, User
+from reviews.synthetic import SyntheticData, Zipf
+
+SIZES = {
+    'users': 60, 'categories': 3, 'genres': 5, 'titles': 40,
+    'reviews': 400, 'comments': 300,
+}
+
+
+def generate(**options):
+    out = StringIO()
+    call_command('generate_data', stdout=out, **{**SIZES, **options})
+    return out.getvalue()
+
+
+class Test32SyntheticData:
+
+    def test_01_zipf_is_skewed(self):
+        zipf = Zipf(range(1000), 1.1, random.Random(1))
+        counts = Counter(zipf.sample(20000))
+        assert set(counts) <= set(range(1000))
+        top = counts.most_common(1)[0][1]
+        median = sorted(counts.values())[len(counts) // 2]
+        assert top > 20 * median, (
+            'Проверьте, что выборка по закону Ципфа сильно перекошена'
+        )
+        distinct = zipf.distinct(50)
+        assert len(set(distinct)) == 50
+
+    def test_02_same_seed_same_rows(self):
+        def rows(seed):
+            data = SyntheticData(seed, 30, 2, 4, 20, 200, 100)
+            return {
+                name: list(getattr(data, name)()) for name in data.FIELDS
+            }
+
+        assert rows('a') == rows('a'), (
+            'Проверьте, что при одном зерне генератор выдаёт те же строки'
+        )
+        assert rows('a') != rows('b')
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_command_fills_database(self):
+        output = generate(seed='7')
+        assert 'строк/с' in output
+        assert User.objects.count() == SIZES['users']
+        assert Title.objects.count() == SIZES['titles']
+        assert Comment.objects.count() == SIZES['comments']
+        reviews = Review.objects.count()
+        assert 0 < reviews <= SIZES['reviews']
+
+        per_title = sorted(
+            Title.objects.annotate(total=Count('reviews')).order_by()
+            .values_list('total', flat=True)
+        )
+        assert per_title[-1] > 4 * per_title[len(per_title) // 2], (
+            'Проверьте, что отзывы распределены по произведениям неравномерно'
+        )
+        title = Title.objects.filter(reviews__isnull=False).first()
+        assert title.rating_count == title.reviews.count(), (
+            'Проверьте, что после генерации пересчитываются рейтинги'
+        )
+        assert not User.objects.get(pk=1).has_usable_password()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_rerun_appends(self):
+        generate(seed='7')
+        first = set(Review.objects.values_list('pk', flat=True))
+        generate(seed='7')
+        assert User.objects.count() == 2 * SIZES['users'], (
+            'Проверьте, что повторный запуск добавляет строки с новыми id'
+        )
+        assert first < set(Review.objects.values_list('pk', flat=True))